@@ -0,0 +1,60 @@
+"""
+Benchmark predict + predict_proba against single-pass score_classifier
+on the five WASH binary targets
+
+Usage: python benchmarks/bench_classification_scoring.py [--models-dir DIR] [--repeats N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from fixtures import load_features, resolve_models_dir
+
+def double_call(model, X):
+    """Scoring path used before score_classifier"""
+    return model.predict(X), model.predict_proba(X)
+
+def time_call(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    from model_registry import ModelRegistry
+    from predictors import WashPredictor, score_classifier
+
+    registry = ModelRegistry(resolve_models_dir(args.models_dir))
+    predictor = WashPredictor()
+    X, _ = load_features('wash')
+
+    print(f"\n{'target':<26}{'rows':>6}{'double (ms)':>14}{'single (ms)':>14}{'speedup':>10}")
+
+    for rows in (1, len(X)):
+        batch = X.iloc[:rows]
+        for target in predictor.classification_targets:
+            model = registry.get(predictor.model_files[target])
+            if model is None:
+                print(f"{target:<26} model file missing")
+                continue
+
+            labels, proba = score_classifier(model, batch)
+            expected_labels, expected_proba = double_call(model, batch)
+            assert np.array_equal(labels, expected_labels), f"{target}: labels differ"
+            assert np.array_equal(proba, expected_proba), f"{target}: probabilities differ"
+
+            double_ms = time_call(lambda: double_call(model, batch), args.repeats) * 1000
+            single_ms = time_call(lambda: score_classifier(model, batch), args.repeats) * 1000
+            print(f"{target:<26}{rows:>6}{double_ms:>14.2f}{single_ms:>14.2f}{double_ms / single_ms:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
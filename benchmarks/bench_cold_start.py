@@ -0,0 +1,91 @@
+"""
+Benchmark cold start of the Streamlit app: startup to first paint, and
+until every model is loaded
+
+Each run is a fresh interpreter, as after a pod restart. Streamlit is imported
+before timing starts, since the server has it loaded before running the
+script. The app is executed with streamlit's AppTest; first paint is the
+app's own first_paint span, models ready is measured from the script start
+until the background warm-up finishes. For comparison, the eager path times
+what used to run before the first paint: importing the LLM processor,
+predictor and results modules and loading every model synchronously.
+
+Usage: python benchmarks/bench_cold_start.py [--runs 5] [--models-dir DIR]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from fixtures import WEBAPP_DIR, resolve_models_dir
+from run_benchmarks import summarize
+
+def lazy_start(models_dir):
+    """Seconds to first paint and to models ready for one app run"""
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    app = AppTest.from_file(str(WEBAPP_DIR / "app.py"), default_timeout=60)
+    app.secrets["OPENAI_API_KEY"] = os.environ["OPENAI_API_KEY"]
+    app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+
+    from metrics import METRICS
+    spans = {span['name']: span for span in METRICS.snapshot()['spans']}
+    # The warm-up thread keeps running after the script returns
+    while 'model_warmup' not in spans:
+        time.sleep(0.005)
+        spans = {span['name']: span for span in METRICS.snapshot()['spans']}
+    models_ready = time.perf_counter() - start
+    return {'first_paint': spans['first_paint']['mean_ms'] / 1e3, 'models_ready': models_ready}
+
+def eager_start(models_dir):
+    """Seconds the previous synchronous initialization took before anything was drawn"""
+    start = time.perf_counter()
+    from llm_processor import LLMProcessor
+    from predictor import ModelPredictor
+    import results
+    LLMProcessor("offline", cache=False)
+    ModelPredictor(models_dir)
+    elapsed = time.perf_counter() - start
+    return {'first_paint': elapsed, 'models_ready': elapsed}
+
+def child(mode, models_dir):
+    import streamlit
+    sys.path.insert(0, str(WEBAPP_DIR))
+    measure = lazy_start if mode == 'lazy' else eager_start
+    print(json.dumps(measure(models_dir)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--child", choices=['lazy', 'eager'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.models_dir)
+        return
+
+    models_dir = str(resolve_models_dir(args.models_dir))
+    env = dict(os.environ, CYPERSONA_MODELS_DIR=models_dir, OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "offline"))
+
+    print(f"\n{'startup':<10}{'first paint p50 (ms)':>22}{'p95':>10}{'models ready p50 (ms)':>23}{'p95':>10}")
+    for mode in ('eager', 'lazy'):
+        samples = []
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, "-W", "ignore", __file__, "--child", mode, "--models-dir", models_dir],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+        paint = summarize([sample['first_paint'] for sample in samples])
+        ready = summarize([sample['models_ready'] for sample in samples])
+        print(f"{mode:<10}{paint['p50_ms']:>22.0f}{paint['p95_ms']:>10.0f}{ready['p50_ms']:>23.0f}{ready['p95_ms']:>10.0f}")
+
+if __name__ == "__main__":
+    main()
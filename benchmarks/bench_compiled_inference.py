@@ -0,0 +1,53 @@
+"""
+Benchmark sklearn estimators against their compiled array evaluators
+on every target of every dataset
+
+Usage: python benchmarks/bench_compiled_inference.py [--models-dir DIR] [--repeats N]
+"""
+
+import argparse
+
+from bench_classification_scoring import time_call
+from fixtures import DATASETS, load_features, resolve_models_dir
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    from compiled_models import compile_estimator, verify_compiled
+    from model_registry import ModelRegistry
+    from predictors import WashPredictor, OliverPredictor, LorinPredictor, score_classifier
+
+    registry = ModelRegistry(resolve_models_dir(args.models_dir), use_compiled=False)
+    predictors = {'wash': WashPredictor(), 'oliver': OliverPredictor(), 'lorin': LorinPredictor()}
+
+    print(f"\n{'target':<40}{'rows':>6}{'sklearn (ms)':>14}{'compiled (ms)':>15}{'speedup':>10}")
+
+    for model_name in DATASETS:
+        predictor = predictors[model_name]
+        X, _ = load_features(model_name)
+        X_array = X.to_numpy()
+
+        for target, model_file in predictor.model_files.items():
+            model = registry.get(model_file)
+            if model is None:
+                print(f"{model_name}/{target:<33} model file missing")
+                continue
+
+            evaluator = compile_estimator(model)
+            if evaluator is None:
+                print(f"{model_name}/{target:<33} not compilable ({type(model).__name__})")
+                continue
+            assert verify_compiled(model, evaluator, X), f"{target}: compiled output differs"
+
+            for rows in (1, len(X)):
+                batch, batch_array = X.iloc[:rows], X_array[:rows]
+                sklearn_ms = time_call(lambda: score_classifier(model, batch), args.repeats) * 1000
+                compiled_ms = time_call(lambda: score_classifier(evaluator, batch_array), args.repeats) * 1000
+                print(f"{model_name + '/' + target:<40}{rows:>6}{sklearn_ms:>14.2f}"
+                      f"{compiled_ms:>15.3f}{sklearn_ms / compiled_ms:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
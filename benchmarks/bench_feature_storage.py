@@ -0,0 +1,50 @@
+"""
+Benchmark loading a feature table from CSV versus typed Parquet,
+in full and for just the columns one model reads
+
+Usage: python benchmarks/bench_feature_storage.py [--dataset wash] [--scale 200] [--repeats 5]
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+from bench_classification_scoring import time_call
+from fixtures import DATASETS, FEATURES_DIR, ROOT_DIR
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default='wash')
+    parser.add_argument("--scale", type=int, default=200, help="Copies of the real rows, for a larger table")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    import pandas as pd
+    from config import MODEL_CONFIGS
+    from feature_store import read_table
+    from data_pipeline.storage import write_table
+
+    df = pd.read_csv(FEATURES_DIR / DATASETS[args.dataset])
+    df = pd.concat([df] * args.scale, ignore_index=True)
+    columns = [feature for feature in MODEL_CONFIGS[args.dataset]['features'] if feature in df.columns][:10]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Separate names, since read_table would pick the Parquet copy of a shared one
+        csv_path, = write_table(df, Path(tmp) / "text", formats=['csv'])
+        parquet_path, = write_table(df, Path(tmp) / "typed", formats=['parquet'], float_dtype='float32')
+
+        print(f"\n{args.dataset}: {len(df):,} rows x {len(df.columns)} columns")
+        print(f"{'format':<10}{'size (MB)':>11}{'full load (ms)':>16}{'10 columns (ms)':>17}{'memory (MB)':>13}")
+        for path in (csv_path, parquet_path):
+            full = time_call(lambda: read_table(path), args.repeats)
+            subset = time_call(lambda: read_table(path, columns), args.repeats)
+            memory = read_table(path).memory_usage(deep=True).sum()
+            print(f"{path.suffix[1:]:<10}{path.stat().st_size / 1e6:>11.1f}{full * 1e3:>16.1f}"
+                  f"{subset * 1e3:>17.1f}{memory / 1e6:>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Offline stand-in for the OpenAI client used by LLMProcessor
+
+Implements client.chat.completions.create with per-model latency, a rate of
+malformed JSON responses and a per-model failure rate, all driven by a seeded
+random generator so runs are repeatable. Responses are random values within
+each feature's schema range.
+"""
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+class FakeAPIError(RuntimeError):
+    """Raised for requests the fake is configured to fail"""
+
+class FakeCompletions:
+    def __init__(self, latency=0.0, jitter=0.0, malformed_rate=0.0, failure_rates=None, seed=0):
+        # latency and jitter are seconds, either one value for all models or {model: seconds}
+        self.latency = latency
+        self.jitter = jitter
+        self.malformed_rate = malformed_rate
+        self.failure_rates = failure_rates or {}
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def _setting(self, value, model):
+        return value.get(model, 0.0) if isinstance(value, dict) else value
+
+    def create(self, model, messages, timeout=None, response_format=None, **kwargs):
+        with self.lock:
+            delay = max(0.0, self._setting(self.latency, model) + self.rng.normal() * self._setting(self.jitter, model))
+            failed = self.rng.random() < self.failure_rates.get(model, 0.0)
+            malformed = self.rng.random() < self.malformed_rate
+            content = self._content(response_format)
+            self.calls.append({'model': model, 'delay': delay, 'failed': failed, 'malformed': malformed})
+
+        # A real request gives up at its timeout
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"{model} timed out after {timeout:.1f}s")
+        time.sleep(delay)
+
+        if failed:
+            raise FakeAPIError(f"{model} returned a server error")
+        if malformed:
+            content = content[:len(content) // 2]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def _content(self, response_format):
+        from config import FEATURE_RANGES, PERSONA_PARAMETERS, INTERVENTION_PARAMETERS
+
+        if response_format and response_format.get('type') == 'json_schema':
+            schema = response_format['json_schema']['schema']
+            stage_parameters = {
+                model_name: list(model_schema['properties'])
+                for model_name, model_schema in schema['properties'].items()
+            }
+        else:
+            # JSON mode carries no schema; answer every feature and let validation keep the stage's
+            stage_parameters = {}
+            for parameters in (PERSONA_PARAMETERS, INTERVENTION_PARAMETERS):
+                for model_name, features in parameters.items():
+                    stage_parameters.setdefault(model_name, []).extend(features)
+
+        response = {}
+        for model_name, features in stage_parameters.items():
+            response[model_name] = {}
+            for feature in features:
+                kind, minimum, maximum = FEATURE_RANGES[feature]
+                if kind == 'integer':
+                    response[model_name][feature] = int(self.rng.integers(minimum, maximum + 1))
+                else:
+                    response[model_name][feature] = round(float(self.rng.uniform(minimum, maximum)), 3)
+        return json.dumps(response)
+
+class FakeOpenAI:
+    """Drop-in for openai.OpenAI exposing chat.completions.create"""
+
+    def __init__(self, **settings):
+        self.completions = FakeCompletions(**settings)
+        self.chat = SimpleNamespace(completions=self.completions)
@@ -0,0 +1,62 @@
+"""
+Shared fixtures for the benchmark scripts
+
+Benchmarks run against the real models/ directory when it is populated. Otherwise
+they train stand-in models with the data pipeline's own train stage on
+data/features, so timings reflect the estimators the pipeline would ship. The
+fixtures keep their own pipeline manifest, so they are retrained whenever the
+feature tables, the training code or the library versions change.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+WEBAPP_DIR = ROOT_DIR / "webapp"
+FEATURES_DIR = ROOT_DIR / "data" / "features"
+MODELS_DIR = ROOT_DIR / "models"
+FIXTURE_MODELS_DIR = Path(tempfile.gettempdir()) / "cypersona_fixture_models"
+
+if str(WEBAPP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEBAPP_DIR))
+# data_pipeline is imported as a package from the repository root
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+DATASETS = {
+    'wash': 'wash_2021_ml_optimized.csv',
+    'oliver': 'oliver_2022_ml_optimized.csv',
+    'lorin': 'lorin_2025_ml_optimized.csv'
+}
+
+def load_features(model_name):
+    """Return (X, full feature frame) for one dataset in MODEL_CONFIGS feature order"""
+    from config import MODEL_CONFIGS
+    from feature_store import read_table
+
+    df = read_table(FEATURES_DIR / DATASETS[model_name])
+    X = df[MODEL_CONFIGS[model_name]['features']].fillna(0).astype('float64')
+    return X, df
+
+def train_fixture_models(target_dir=FIXTURE_MODELS_DIR):
+    """Run the pipeline's train stage into target_dir, skipped while its inputs are unchanged"""
+    from data_pipeline.pipeline import run_pipeline
+
+    target_dir = Path(target_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    results = run_pipeline(stages=['train'], models_dir=target_dir, manifest_path=target_dir / "pipeline_manifest.json")
+    failed = [stage_key for stage_key, status in results.items() if status == 'failed']
+    if failed:
+        raise RuntimeError(f"Fixture training failed: {', '.join(failed)}")
+    return target_dir
+
+def resolve_models_dir(models_dir=None):
+    """Use the given or real models directory, falling back to trained fixtures"""
+    if models_dir is not None:
+        return Path(models_dir)
+    if MODELS_DIR.exists() and any(MODELS_DIR.glob("*_model.joblib")):
+        return MODELS_DIR
+    print(f"No trained models found, using fixtures in {FIXTURE_MODELS_DIR}")
+    return train_fixture_models()
@@ -0,0 +1,204 @@
+"""
+End-to-end latency of every stage of a prediction request, run offline
+against FakeOpenAI
+
+Stages: initialize_components (LLMProcessor + ModelPredictor with a cold
+model registry), extract_parameters, _extract_json, _expand_parameters,
+predict_all (distinct personas, then one repeated persona served from the
+prediction cache), each predictor's __call__ and the nearest-respondent
+lookup of each dataset. Reports p50/p95/p99 latency and throughput per
+stage, and saves them to benchmarks/results/ named by time and commit so
+runs can be compared.
+
+Usage: python benchmarks/run_benchmarks.py [--iterations 200] [--llm-iterations 30]
+           [--latency 0.05] [--jitter 0.01] [--malformed-rate 0.1] [--fail gpt-4o=0.2]
+           [--models-dir DIR] [--compare benchmarks/results/<run>.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+import numpy as np
+
+from fake_openai import FakeOpenAI
+from fixtures import ROOT_DIR, resolve_models_dir
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+def measure(fn, iterations, setup=None):
+    """Per-call wall times of fn(setup()) in seconds; setup is not timed"""
+    samples = []
+    for i in range(iterations):
+        argument = setup(i) if setup is not None else None
+        start = time.perf_counter()
+        fn(argument)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def summarize(samples):
+    samples = np.asarray(samples)
+    return {
+        'n': int(len(samples)),
+        'p50_ms': float(np.percentile(samples, 50) * 1e3),
+        'p95_ms': float(np.percentile(samples, 95) * 1e3),
+        'p99_ms': float(np.percentile(samples, 99) * 1e3),
+        'mean_ms': float(samples.mean() * 1e3),
+        'throughput_per_s': float(len(samples) / samples.sum()) if samples.sum() > 0 else float('inf')
+    }
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def parse_failures(values):
+    """['gpt-4o=0.2', ...] -> {'gpt-4o': 0.2}"""
+    failures = {}
+    for value in values:
+        model, _, rate = value.partition('=')
+        failures[model] = float(rate)
+    return failures
+
+def run(args):
+    """Run every stage; returns {stage: summary} plus extraction outcome counts"""
+    from config import MODEL_CONFIGS, PERSONA_PARAMETERS
+    from llm_processor import LLMProcessor
+    from model_registry import get_registry
+    from parameter_schema import build_response_format, validate_parameters
+    from predictor import ModelPredictor
+
+    models_dir = resolve_models_dir(args.models_dir)
+    fake = FakeOpenAI(latency=args.latency, jitter=args.jitter, malformed_rate=args.malformed_rate,
+                      failure_rates=parse_failures(args.fail), seed=args.seed)
+    stages = {}
+
+    def initialize(_):
+        # What initialize_components builds, with no resident models to reuse
+        get_registry(models_dir).clear()
+        return LLMProcessor("offline", cache=False, client=fake), ModelPredictor(models_dir)
+
+    stages['initialize_components'] = measure(initialize, args.init_iterations)
+    llm_processor, model_predictor = initialize(None)
+    llm_processor.hedge_delay = args.hedge_delay
+    llm_processor.request_budget = args.request_budget
+
+    persona = "A 45-year-old accountant who reads email on a phone between meetings."
+    intervention = "Monthly simulated phishing emails followed by a two-minute training video."
+    fallbacks = 0
+    def extract(_):
+        nonlocal fallbacks
+        llm_processor.extract_parameters(persona, intervention)
+        fallbacks += any(entry['model'] is None for entry in llm_processor.last_extraction.values())
+    stages['extract_parameters'] = measure(extract, args.llm_iterations)
+
+    response_format = build_response_format("persona_parameters", PERSONA_PARAMETERS)
+    responses = [fake.completions._content(response_format) for _ in range(args.iterations)]
+    stages['_extract_json'] = measure(
+        lambda content: llm_processor._extract_json(content, PERSONA_PARAMETERS),
+        args.iterations, lambda i: responses[i]
+    )
+
+    core_params = [validate_parameters(json.loads(content), PERSONA_PARAMETERS) for content in responses]
+    stages['_expand_parameters'] = measure(llm_processor._expand_parameters, args.iterations, lambda i: core_params[i])
+
+    # Distinct personas miss the prediction cache; a repeated one hits it
+    personas = [llm_processor._expand_parameters(params) for params in core_params]
+    stages['predict_all'] = measure(model_predictor.predict_all, args.iterations, lambda i: personas[i])
+    stages['predict_all (cached)'] = measure(model_predictor.predict_all, args.iterations, lambda i: personas[0])
+
+    import pandas as pd
+    for model_name, predictor in model_predictor.models.items():
+        frames = [pd.DataFrame([{feature: persona_params[model_name][feature]
+                                 for feature in MODEL_CONFIGS[model_name]['features']}])
+                  for persona_params in personas]
+        stages[f"{type(predictor).__name__}.__call__"] = measure(predictor, args.iterations, lambda i: frames[i])
+
+    from neighbors import get_index
+    for model_name in model_predictor.models:
+        index = get_index(model_name)
+        stages[f"NeighborIndex.query ({model_name})"] = measure(
+            lambda params: index.query(params, 5), args.iterations, lambda i: personas[i][model_name]
+        )
+
+    calls = fake.completions.calls
+    outcomes = {
+        'requests': len(calls),
+        'failed': sum(call['failed'] for call in calls),
+        'malformed': sum(call['malformed'] for call in calls),
+        'fallbacks': fallbacks,
+        'model_wins': dict(llm_processor.model_wins)
+    }
+    return {stage: summarize(samples) for stage, samples in stages.items()}, outcomes
+
+def print_report(results, baseline=None):
+    print(f"\n{'stage':<36}{'p50 (ms)':>11}{'p95 (ms)':>11}{'p99 (ms)':>11}{'per s':>10}" +
+          (f"{'p50 vs base':>14}" if baseline else ""))
+    for stage, summary in results['stages'].items():
+        line = (f"{stage:<36}{summary['p50_ms']:>11.2f}{summary['p95_ms']:>11.2f}"
+                f"{summary['p99_ms']:>11.2f}{summary['throughput_per_s']:>10.1f}")
+        if baseline:
+            previous = baseline['stages'].get(stage)
+            line += f"{(summary['p50_ms'] / previous['p50_ms'] - 1) * 100:>+13.1f}%" if previous else f"{'new':>14}"
+        print(line)
+
+    outcomes = results['llm_outcomes']
+    print(f"\nFake API: {outcomes['requests']} requests, {outcomes['failed']} failed, "
+          f"{outcomes['malformed']} malformed, {outcomes['fallbacks']} extractions fell back to defaults")
+    print(f"Winning models: {outcomes['model_wins']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--llm-iterations", type=int, default=30)
+    parser.add_argument("--init-iterations", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake API latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Standard deviation of the latency")
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--fail", nargs="*", default=[], metavar="MODEL=RATE", help="Per-model failure rates")
+    parser.add_argument("--hedge-delay", type=float, default=0.2)
+    parser.add_argument("--request-budget", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--compare", default=None, help="Earlier results file to compare against")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    # The processors log every step; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        stages, outcomes = run(args)
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('compare', 'no_save')},
+        'stages': stages,
+        'llm_outcomes': outcomes
+    }
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    if baseline:
+        print(f"Comparing against {baseline['commit']} ({baseline['timestamp']})")
+    print_report(results, baseline)
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+        path.write_text(json.dumps(results, indent=2))
+        print(f"\nSaved {path}")
+
+if __name__ == "__main__":
+    main()
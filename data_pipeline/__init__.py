@@ -0,0 +1,5 @@
+"""
+Dataset processing and model training, importable outside the notebooks
+
+Run the whole pipeline with: python -m data_pipeline.pipeline
+"""
@@ -8,6 +8,10 @@ class Config:
     FEATURES_DIR = ROOT_DIR / "data" / "features"
     MODELS_DIR = ROOT_DIR / "models"
     PERSONAS_DIR = ROOT_DIR / "personas"
+    # Stage fingerprints written by pipeline.py
+    PIPELINE_MANIFEST = ROOT_DIR / "data" / "pipeline_manifest.json"
+    # Formats the pipeline writes cleaned and feature tables in; readers prefer Parquet
+    DATA_FORMATS = ['parquet', 'csv']
     
     # Ensure directories exist
     CLEANED_DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,225 @@
+"""
+Lorin 2025 personality and phishing capability dataset: raw -> cleaned -> ML features
+
+Extracted from lorin_2025_processor.ipynb so the stage pipeline can import it.
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from .config import Config
+
+RAW_FILE = "phishing_lorin_2025.csv"
+CLEANED_FILE = "lorin_2025_cleaned.csv"
+FEATURES_FILE = "lorin_2025_ml_optimized.csv"
+
+# Both targets are continuous accuracy scores (0-1), so use regression
+CLASSIFICATION_TARGETS = []
+REGRESSION_TARGETS = ['class_phish_accuracy', 'class_nophish_accuracy']
+
+X_FEATURES = [
+    # Demographics (5)
+    'age_category', 'education_level', 'it_experience', 'email_frequency', 'security_training_prior',
+    
+    # Big Five Personality (5)
+    'personality_extraversion', 'personality_agreeableness', 'personality_conscientiousness',
+    'personality_neuroticism', 'personality_openness',
+    
+    # Pre-Training Security Attitudes (5) 
+    'pre_security_engagement', 'pre_security_attentiveness', 'pre_security_resistance',
+    'pre_security_concern', 'pre_security_attitude_total',
+    
+    # Baseline Capabilities (2)
+    'knowledge_total', 'proficiency'
+]
+
+class Lorin2025Processor:
+    """Processes Lorin et al. (2025) dataset for personality-based capability prediction"""
+    
+    @staticmethod
+    def process(raw_path=None):
+        print("Processing Lorin 2025 Dataset...")
+        
+        df = pd.read_csv(raw_path or Config.RAW_DATA_DIR / RAW_FILE)
+        print(f"Raw data: {len(df)} rows, {len(df.columns)} columns")
+        
+        # Feature mapping based on the provided specification
+        features = {
+            # === DEMOGRAPHICS & BACKGROUND ===
+            'age_category': 'dem_age',
+            'education_level': 'dem_edu', 
+            'it_experience': 'dem_it',
+            'email_frequency': 'mailboxfrequency',
+            'security_training_prior': 'securitytraining',
+            
+            # === BIG FIVE PERSONALITY TRAITS (COMPOSITES) ===
+            'personality_extraversion': 'bfi_extraversion',
+            'personality_agreeableness': 'bfi_agreeableness', 
+            'personality_conscientiousness': 'bfi_conscientiousness',
+            'personality_neuroticism': 'bfi_neuroticism',
+            'personality_openness': 'bfi_openness',
+            
+            # === PRE-TRAINING SECURITY ATTITUDES ===
+            'security_engagement': 'pre.sa13_engagement',
+            'security_attentiveness': 'pre.sa13_attentiveness', 
+            'security_resistance': 'pre.sa13_resistance',
+            'security_concern': 'pre.sa13_concernedness',
+            'security_attitude_total': 'pre.sa13_total',
+            
+            # === BASELINE CAPABILITIES ===
+            'knowledge_total': 'knowledge_total_pre',
+            'proficiency': 'proficiency_pre',
+            
+            # === TARGET VARIABLES ===
+            'class_phish_accuracy': 'class_phish_accuracy_pre',
+            'class_nophish_accuracy': 'class_nophish_accuracy_pre',
+        }
+        
+        # Create cleaned dataframe
+        cleaned = pd.DataFrame()
+        missing_cols = []
+        
+        for new_col, old_col in features.items():
+            if old_col in df.columns:
+                cleaned[new_col] = df[old_col]
+            else:
+                print(f"Warning: Column '{old_col}' not found, setting '{new_col}' to NaN")
+                cleaned[new_col] = np.nan
+                missing_cols.append(old_col)
+        
+        # Data quality filters
+        initial_count = len(cleaned)
+        
+        # Filter 1: Remove rows with missing target variables
+        target_cols = ['class_phish_accuracy', 'class_nophish_accuracy']
+        cleaned = cleaned.dropna(subset=target_cols, how='all')
+        print(f"After target filter: {len(cleaned)} rows (removed {initial_count - len(cleaned)})")
+        
+        # Filter 2: Remove rows with missing core demographics
+        demo_cols = ['age_category', 'education_level']
+        available_demo = [col for col in demo_cols if col in cleaned.columns]
+        if available_demo:
+            cleaned = cleaned.dropna(subset=available_demo, how='all')
+            print(f"After demographics filter: {len(cleaned)} rows")
+        
+        print(f"Final cleaned dataset: {len(cleaned)} rows, {len(cleaned.columns)} features")
+        if missing_cols:
+            print(f"Missing columns: {missing_cols}")
+            
+        return cleaned
+
+def create_ml_optimized(df):
+    """Transform Lorin data into ML-ready features with consistent categorization"""
+    
+    ml_df = pd.DataFrame()
+    scaler = StandardScaler()
+    print(f"Creating ML features from {len(df)} rows...")
+    
+    # ===================================================================
+    # 1. DEMOGRAPHICS (5 features) - Consistent with Wash/Oliver
+    # ===================================================================
+    
+    # Age categories (consistent mapping: 1=youngest, 5=oldest)
+    age_map = {
+        '18-25': 1, '26-35': 2, '36-45': 3, 
+        '46-55': 4, '56-65': 5, '66-75': 5, '>75': 5
+    }
+    ml_df['age_category'] = df['age_category'].map(age_map).fillna(3)
+    
+    # Education level (consistent 4-tier system): 1=Low, 2=Medium-Low, 3=Medium-High, 4=High
+    education_map = {
+        'No formal qualifications': 1,
+        'Primary school': 1,
+        'Secondary school': 2,
+        'College': 2,
+        'Technical degree': 3,
+        'Undergraduate degree': 3,
+        'Postgraduate degree': 4,
+        'Doctoral degree': 4
+    }
+    ml_df['education_level'] = df['education_level'].map(education_map).fillna(2)
+    
+    # IT experience level (ordinal: 1=None to 4=Expert)
+    it_map = {
+        'No experience': 1,
+        'Little experience': 2, 
+        'Some experience': 3,
+        'Experienced': 4
+    }
+    ml_df['it_experience'] = df['it_experience'].map(it_map).fillna(2)
+    
+    # Email frequency (ordinal: 1=Rarely to 5=Very frequently)
+    email_map = {
+        'Never': 1, 'Rarely': 2, 'Sometimes': 3, 
+        'Often': 4, 'Very often': 5
+    }
+    ml_df['email_frequency'] = df['email_frequency'].map(email_map).fillna(3)
+    
+    # Security training prior (binary)
+    training_map = {'Yes': 1, 'No': 0}
+    ml_df['security_training_prior'] = df['security_training_prior'].map(training_map).fillna(0)
+    
+    # ===================================================================
+    # 2. BIG FIVE PERSONALITY TRAITS (5 features)
+    # ===================================================================
+    
+    personality_fields = [
+        'personality_extraversion', 'personality_agreeableness',
+        'personality_conscientiousness', 'personality_neuroticism', 'personality_openness'
+    ]
+    
+    for field in personality_fields:
+        if field in df.columns:
+            values = df[field].fillna(df[field].mean())
+            ml_df[field] = scaler.fit_transform(values.values.reshape(-1, 1)).flatten()
+        else:
+            ml_df[field] = 0.0
+    
+    # ===================================================================
+    # 3. PRE-TRAINING SECURITY ATTITUDES (5 features)
+    # ===================================================================
+    
+    security_attitude_fields = [
+        'pre_security_engagement', 'pre_security_attentiveness',
+        'pre_security_resistance', 'pre_security_concern', 'pre_security_attitude_total'
+    ]
+    
+    for field in security_attitude_fields:
+        if field in df.columns:
+            values = df[field].fillna(df[field].mean())
+            ml_df[field] = scaler.fit_transform(values.values.reshape(-1, 1)).flatten()
+        else:
+            ml_df[field] = 0.0
+    
+    # ===================================================================
+    # 4. BASELINE CAPABILITIES (2 features) - Standardized
+    # ===================================================================
+    
+    capability_fields = ['knowledge_total', 'proficiency']
+    
+    for field in capability_fields:
+        if field in df.columns:
+            values = df[field].fillna(df[field].mean())
+            ml_df[field] = scaler.fit_transform(values.values.reshape(-1, 1)).flatten()
+        else:
+            ml_df[field] = 0.0
+    
+    # ===================================================================
+    # 5. TARGET VARIABLES (2 features)
+    # ===================================================================
+    
+    target_fields = ['class_phish_accuracy', 'class_nophish_accuracy']
+    
+    for field in target_fields:
+        if field in df.columns:
+            ml_df[field] = df[field].fillna(df[field].mean())
+        else:
+            ml_df[field] = 0.5  # Default to 50% accuracy
+    
+    # Convert all to numeric and fill NaN
+    for col in ml_df.columns:
+        ml_df[col] = pd.to_numeric(ml_df[col], errors='coerce').fillna(0)
+    
+    print(f"ML features: {len(ml_df)} rows, {len(ml_df.columns)} features")
+    return ml_df
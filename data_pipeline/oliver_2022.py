@@ -0,0 +1,160 @@
+"""
+Oliver 2022 phishing knowledge dataset: raw survey -> cleaned -> ML features
+
+Extracted from oliver_2022_processor.ipynb so the stage pipeline can import it.
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from .config import Config
+
+RAW_FILE = "phishing_oliver_2022.csv"
+CLEANED_FILE = "oliver_2022_cleaned.csv"
+FEATURES_FILE = "oliver_2022_ml_optimized.csv"
+
+CLASSIFICATION_TARGETS = []
+REGRESSION_TARGETS = ['phishing_test_percent_correct', 'knowledge_test_percent_correct']
+
+X_FEATURES = [
+    'age_category', 'gender', 'education_level', 'employment_status',
+    'it_job', 'phishing_victim', 'phishing_victim_count',
+    'perceived_knowledge', 'perceived_self_efficacy', 'perceived_severity', 
+    'perceived_vulnerability', 'email_trust'
+]
+
+class Oliver2022Processor:
+    """Maps the raw Oliver 2022 export onto named columns and filters respondents"""
+    @staticmethod
+    def process(raw_path=None):
+        print("Processing Oliver 2022 Dataset...")
+        
+        # Try different encodings
+        for encoding in ['utf-8', 'cp1252', 'iso-8859-1', 'latin1']:
+            try:
+                df = pd.read_csv(raw_path or Config.RAW_DATA_DIR / RAW_FILE, encoding=encoding)
+                print(f"Loaded with {encoding} encoding: {len(df)} rows, {len(df.columns)} columns")
+                break
+            except UnicodeDecodeError:
+                continue
+        
+        # Feature mapping
+        features = {
+            # Demographics
+            'age': 'DE02_01',
+            'gender': 'Sex',
+            'education_level': 'Edu1',
+            'employment_status': 'Job',
+            'employment_type': 'Anstllung',
+            
+            # IT Background
+            'it_job_status': 'ITSJOB',
+            'phishing_victim_count': 'Phish_Vic_Count',
+            
+            # PMT Constructs
+            'perceived_knowledge': 'Per_Know',
+            'perceived_self_efficacy': 'Per_SE',
+            'perceived_severity': 'Per_Sev',
+            'perceived_vulnerability': 'Per_Vuln',
+            'email_trust': 'E_Trust',
+            
+            # Performance Measures
+            'knowledge_test_percent_correct': 'correct_percent_kt',
+            'phishing_test_percent_correct': 'correct_percent_pt',
+            'knowledge_test_total_correct': 'correct_total_kt',
+            'phishing_test_total_correct': 'correct_total_pt',
+        }
+        
+        # Create cleaned dataframe
+        cleaned = pd.DataFrame()
+        for new_col, old_col in features.items():
+            if old_col in df.columns:
+                cleaned[new_col] = df[old_col]
+            else:
+                cleaned[new_col] = np.nan
+        
+        # Data quality filters
+        initial_count = len(cleaned)
+        cleaned = cleaned.dropna(subset=['age', 'gender'], how='any')
+        performance_cols = ['knowledge_test_percent_correct', 'phishing_test_percent_correct']
+        cleaned = cleaned.dropna(subset=performance_cols, how='all')
+        
+        print(f"After filtering: {len(cleaned)} rows (removed {initial_count - len(cleaned)})")
+        return cleaned
+
+def create_ml_optimized(df):
+    """Transform Oliver data into ML-ready features"""
+    
+    ml_df = pd.DataFrame()
+    scaler = StandardScaler()
+    print(f"Creating ML features from {len(df)} rows...")
+    
+    # Demographics (5 features) - Consistent with Wash categories
+    # Age categories (same as Wash)
+    age_bins = [0, 25, 35, 55, 75, 100]
+    age_labels = [1, 2, 3, 4, 5]  # 1=youngest, 5=oldest
+    ml_df['age_category'] = pd.cut(df['age'], bins=age_bins, labels=age_labels, include_lowest=True).fillna(3)
+    
+    # Gender (binary: 1=Male, 0=Female)
+    gender_map = {1: 0, 2: 1}  # Male=1, Female=0 
+    ml_df['gender'] = df['gender'].map(gender_map).fillna(0)
+    
+    # Education level
+    # 1=Dropped out, 3=Elementary, 4=Secondary, 5=Apprenticeship, 6=Vocational, 7=A-levels, 8=College/University, 9=Still in school, 10=Other
+    education_map = {
+        1: 1, 9: 1,  # Low: Dropped out, Still in school
+        3: 2, 4: 2,  # Medium-Low: Elementary, Secondary  
+        5: 3, 6: 3, 7: 3,  # Medium-High: Apprenticeship, Vocational, A-levels
+        8: 4,  # High: College/University
+        10: 2  # Other -> Medium-Low
+    }
+    ml_df['education_level'] = df['education_level'].map(education_map).fillna(2)
+    
+    # Employment Status (binary: employed=1, unemployed=0, based on employment_type)
+    # 1=High Schooler, 2=Apprenticeship, 3=Student, 4=Employee, 5=Public Servant, 6=Self-Employed, 7=Unemployed, 8=Other
+    employment_map = {
+        1: 0, 3: 0, 7: 0,  # Not working: High schooler, Student, Unemployed
+        2: 0,  # Training: Apprenticeship
+        4: 1, 5: 1,  # Employee: Employee, Public servant
+        6: 1,  # Self-employed
+        8: 0  # Other -> Not working
+    }
+    ml_df['employment_status'] = df['employment_type'].map(employment_map).fillna(0)
+    
+    # IT Background (3 features)
+    it_job_map = {1: 1, 2: 1, 3: 1, 4: 0, 5: 0}  # Regular IT work vs Little/None
+    ml_df['it_job'] = df['it_job_status'].map(it_job_map).fillna(0)
+    ml_df['phishing_victim'] = (df['phishing_victim_count'] > 0).astype(int)
+    
+    # Standardized victim count
+    victim_counts = df['phishing_victim_count'].fillna(0)
+    ml_df['phishing_victim_count'] = scaler.fit_transform(victim_counts.values.reshape(-1, 1)).flatten()
+    
+    # PMT Constructs (5 features) - Standardized
+    pmt_fields = ['perceived_knowledge', 'perceived_self_efficacy', 'perceived_severity', 
+                  'perceived_vulnerability', 'email_trust']
+    
+    for field in pmt_fields:
+        if field in df.columns:
+            values = df[field].fillna(df[field].mean())
+            ml_df[field] = scaler.fit_transform(values.values.reshape(-1, 1)).flatten()
+        else:
+            ml_df[field] = 0.0
+    
+    # Performance Measures (4 features) - Standardized
+    performance_fields = ['knowledge_test_percent_correct', 'phishing_test_percent_correct']
+    
+    for field in performance_fields:
+        if field in df.columns:
+            values = df[field].fillna(df[field].mean())
+            ml_df[field] = scaler.fit_transform(values.values.reshape(-1, 1)).flatten()
+        else:
+            ml_df[field] = 0.0
+    
+    # Convert all to float and fill NaN
+    for col in ml_df.columns:
+        ml_df[col] = pd.to_numeric(ml_df[col], errors='coerce').fillna(0)
+    
+    print(f"ML features: {len(ml_df)} rows, {len(ml_df.columns)} features")
+    return ml_df
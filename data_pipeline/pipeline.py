@@ -0,0 +1,235 @@
+"""
+Incremental data pipeline: raw -> cleaned -> features -> models
+
+Every dataset runs the same three stages. A stage's fingerprint hashes the
+bytes of its input files, the source of the code it runs, its parameters and
+the library versions; the stage is skipped when the fingerprint matches the
+manifest and its recorded outputs are unchanged on disk. Outputs are hashed
+as well, so a stage that reruns but writes identical bytes does not force the
+stages after it to rerun.
+
+Usage (from the repository root):
+    python -m data_pipeline.pipeline [--datasets wash oliver] [--stages clean features] [--force]
+    python -m data_pipeline.pipeline --status
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from . import wash_2021, oliver_2022, lorin_2025
+from .config import Config
+from .storage import resolve_table, read_table, write_table
+from .training import (remove_column_suffixes, feature_columns, candidate_models, cv_settings, train_model,
+                       evaluate_final, train_targets, save_models, compile_models)
+
+DATASETS = {
+    'wash': {'module': wash_2021, 'processor': wash_2021.Wash2021Processor, 'strip_suffixes': True},
+    # The Oliver notebook saved its features without remove_column_suffixes
+    'oliver': {'module': oliver_2022, 'processor': oliver_2022.Oliver2022Processor, 'strip_suffixes': False},
+    'lorin': {'module': lorin_2025, 'processor': lorin_2025.Lorin2025Processor, 'strip_suffixes': True}
+}
+
+STAGES = ['clean', 'features', 'train']
+
+LIBRARY_VERSIONS = {'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__}
+
+def file_digest(path):
+    """blake2b of a file's contents"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def code_digest(*objects):
+    """blake2b of the source of functions and classes"""
+    digest = hashlib.blake2b(digest_size=16)
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode('utf-8'))
+    return digest.hexdigest()
+
+def _relative(path):
+    path = Path(path)
+    try:
+        return str(path.resolve().relative_to(Config.ROOT_DIR.resolve()))
+    except ValueError:
+        return str(path)
+
+class Stage:
+    """One cached step: run() must return the list of files it wrote"""
+
+    def __init__(self, key, inputs, code, params, run):
+        self.key = key
+        self.inputs = inputs
+        self.code = code
+        self.params = params
+        self.run = run
+
+    def fingerprint(self):
+        try:
+            # The copy a stage reads, e.g. the Parquet table when it is the newer one
+            inputs = [resolve_table(path) for path in self.inputs]
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"{self.key} needs {e}")
+
+        parts = {
+            'inputs': {_relative(path): file_digest(path) for path in inputs},
+            'code': code_digest(*self.code),
+            'params': self.params,
+            'versions': LIBRARY_VERSIONS
+        }
+        return hashlib.blake2b(json.dumps(parts, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+def dataset_stages(model_name, models_dir=None):
+    """clean, features and train stages of one dataset"""
+    dataset = DATASETS[model_name]
+    module = dataset['module']
+    raw_path = Config.RAW_DATA_DIR / module.RAW_FILE
+    cleaned_path = Config.CLEANED_DATA_DIR / module.CLEANED_FILE
+    features_path = Config.FEATURES_DIR / module.FEATURES_FILE
+    targets = module.CLASSIFICATION_TARGETS + module.REGRESSION_TARGETS
+
+    def clean():
+        return write_table(dataset['processor'].process(raw_path), cleaned_path)
+
+    def features():
+        ml_df = module.create_ml_optimized(read_table(cleaned_path))
+        if dataset['strip_suffixes']:
+            ml_df = remove_column_suffixes(ml_df)
+        return write_table(ml_df, features_path, float_dtype='float32')
+
+    def train():
+        df = read_table(features_path)
+        x_features = feature_columns(df, module.X_FEATURES, targets)
+        trained_models, model_info = train_targets(df, x_features, module.CLASSIFICATION_TARGETS,
+                                                   module.REGRESSION_TARGETS)
+        written = save_models(model_name, trained_models, model_info, x_features, models_dir)
+        return written + compile_models(model_name, models_dir)
+
+    return [
+        Stage(f"{model_name}/clean", [raw_path], [dataset['processor']], {'formats': Config.DATA_FORMATS}, clean),
+        Stage(f"{model_name}/features", [cleaned_path], [module.create_ml_optimized, remove_column_suffixes],
+              {'strip_suffixes': dataset['strip_suffixes'], 'formats': Config.DATA_FORMATS}, features),
+        Stage(f"{model_name}/train", [features_path],
+              [feature_columns, candidate_models, cv_settings, train_model, evaluate_final, train_targets,
+               save_models, compile_models],
+              {'x_features': module.X_FEATURES, 'classification': module.CLASSIFICATION_TARGETS,
+               'regression': module.REGRESSION_TARGETS, 'models_dir': _relative(models_dir or Config.MODELS_DIR)},
+              train)
+    ]
+
+class Manifest:
+    """Fingerprints and output digests of completed stages, kept in a JSON file"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path is not None else Config.PIPELINE_MANIFEST
+        self.entries = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text())
+            except json.JSONDecodeError:
+                print(f"✗ Ignoring unreadable manifest {self.path}")
+
+    def is_current(self, stage_key, fingerprint):
+        entry = self.entries.get(stage_key)
+        if entry is None or entry['fingerprint'] != fingerprint:
+            return False
+        for relative_path, digest in entry['outputs'].items():
+            path = Config.ROOT_DIR / relative_path
+            if not path.exists() or file_digest(path) != digest:
+                return False
+        return True
+
+    def record(self, stage_key, fingerprint, outputs, elapsed):
+        self.entries[stage_key] = {
+            'fingerprint': fingerprint,
+            'outputs': {_relative(path): file_digest(path) for path in outputs},
+            'elapsed': round(elapsed, 3),
+            'completed_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }
+        # Saved after every stage so an interrupted run keeps what it finished
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self.entries, indent=2, sort_keys=True))
+        os.replace(tmp_path, self.path)
+
+def run_pipeline(datasets=None, stages=None, force=False, models_dir=None, manifest_path=None):
+    """Run the selected stages in order, skipping those whose inputs are unchanged
+
+    Returns {stage_key: 'ran' | 'skipped' | 'failed'}.
+    """
+    manifest = Manifest(manifest_path)
+    stages = stages or STAGES
+    results = {}
+    start = time.perf_counter()
+
+    for model_name in datasets or DATASETS:
+        for stage in dataset_stages(model_name, models_dir):
+            if stage.key.split('/')[1] not in stages:
+                continue
+
+            try:
+                fingerprint = stage.fingerprint()
+                if not force and manifest.is_current(stage.key, fingerprint):
+                    print(f"✓ {stage.key} is up to date")
+                    results[stage.key] = 'skipped'
+                    continue
+
+                print(f"Running {stage.key}...")
+                stage_start = time.perf_counter()
+                outputs = stage.run()
+                elapsed = time.perf_counter() - stage_start
+                manifest.record(stage.key, fingerprint, outputs, elapsed)
+                print(f"✓ {stage.key} finished in {elapsed:.1f}s")
+                results[stage.key] = 'ran'
+            except Exception as e:
+                # Later stages of this dataset would read stale or missing inputs
+                print(f"✗ {stage.key} failed: {e}")
+                results[stage.key] = 'failed'
+                break
+
+    ran = sum(status == 'ran' for status in results.values())
+    print(f"Pipeline done in {time.perf_counter() - start:.1f}s: {ran} of {len(results)} stages ran")
+    return results
+
+def pipeline_status(datasets=None, models_dir=None, manifest_path=None):
+    """{stage_key: 'current' | 'stale' | 'missing input'} without running anything"""
+    manifest = Manifest(manifest_path)
+    status = {}
+    for model_name in datasets or DATASETS:
+        for stage in dataset_stages(model_name, models_dir):
+            try:
+                status[stage.key] = 'current' if manifest.is_current(stage.key, stage.fingerprint()) else 'stale'
+            except FileNotFoundError:
+                status[stage.key] = 'missing input'
+    return status
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental raw -> cleaned -> features -> models pipeline")
+    parser.add_argument("--datasets", nargs="+", choices=sorted(DATASETS), default=None)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=None)
+    parser.add_argument("--force", action="store_true", help="Rerun stages even if their inputs are unchanged")
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--status", action="store_true", help="Report which stages would run, then exit")
+    args = parser.parse_args()
+
+    if args.status:
+        for stage_key, stage_status in pipeline_status(args.datasets, args.models_dir).items():
+            print(f"{stage_key:20s} {stage_status}")
+        return
+
+    results = run_pipeline(args.datasets, args.stages, args.force, args.models_dir)
+    if 'failed' in results.values():
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
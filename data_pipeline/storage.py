@@ -0,0 +1,80 @@
+"""
+Typed columnar storage for cleaned and feature tables
+
+Tables are written as CSV (readable, diffable) and Parquet with compact dtypes:
+integral columns become the smallest integer type that holds them (int8 for
+flags and 1-5 categories) and, for feature tables, other floats become float32.
+Readers (webapp/feature_store.py, re-exported here) take a path with either
+suffix, use whichever copy is newer (Parquet on a tie), and can load only the
+columns they need.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import Config
+
+# Reading is shared with the webapp, which is deployed without this package;
+# its feature_store.py is the one implementation of resolve_table and read_table
+WEBAPP_DIR = Config.ROOT_DIR / "webapp"
+if str(WEBAPP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEBAPP_DIR))
+from feature_store import resolve_table, read_table
+
+SUFFIXES = {'parquet': '.parquet', 'csv': '.csv'}
+
+def table_path(path, table_format):
+    """path with the suffix of table_format"""
+    return Path(path).with_suffix(SUFFIXES[table_format])
+
+def compact_dtypes(df, float_dtype=None):
+    """Downcast integral columns to the smallest integer type; floats to float_dtype if given
+
+    Columns with missing values stay floating point, and text columns are left alone.
+    """
+    compact = {}
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_bool_dtype(values) or not pd.api.types.is_numeric_dtype(values):
+            compact[column] = values
+            continue
+
+        array = values.to_numpy(dtype=float)
+        if not np.isnan(array).any() and np.array_equal(array, np.round(array)):
+            for dtype in (np.int8, np.int16, np.int32, np.int64):
+                info = np.iinfo(dtype)
+                if len(array) == 0 or (array.min() >= info.min and array.max() <= info.max):
+                    compact[column] = values.astype(dtype)
+                    break
+        elif float_dtype is not None:
+            compact[column] = values.astype(float_dtype)
+        else:
+            compact[column] = values
+    return pd.DataFrame(compact, index=df.index)
+
+def write_table(df, path, formats=None, float_dtype=None):
+    """Write df in every format of formats (default Config.DATA_FORMATS); returns the paths written
+
+    The CSV copy is written from df unchanged; only the Parquet copy is compacted.
+    """
+    written = []
+    for table_format in formats or Config.DATA_FORMATS:
+        target = table_path(path, table_format)
+        # Written beside the target and swapped in, so an interrupted run leaves no partial file
+        tmp_path = target.with_name(target.name + ".tmp")
+        if table_format == 'parquet':
+            compact_dtypes(df, float_dtype).to_parquet(tmp_path, index=False)
+        else:
+            df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, target)
+        written.append(target)
+    # One shared mtime, so readers prefer Parquet instead of whichever copy was written last
+    if len(written) > 1:
+        mtime_ns = max(target.stat().st_mtime_ns for target in written)
+        for target in written:
+            os.utime(target, ns=(mtime_ns, mtime_ns))
+    return written
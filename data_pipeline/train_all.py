@@ -0,0 +1,240 @@
+"""
+Parallel training of every target of every dataset
+
+train_model cross-validates the candidates of one target at a time. This
+driver flattens all (dataset, target, candidate, fold) fits into one job list
+and runs it on a process pool, so the ten targets share every core. Each
+dataset's feature matrix and targets are written once as .npy files that the
+workers memory-map instead of receiving pickled copies. As soon as all folds of
+a target are scored, the winning candidate's final 80/20 fit is queued.
+
+Scores, model choices and saved models match train_targets; the fold splits,
+candidates and scoring come from the same helpers.
+
+Usage (from the repository root):
+    python -m data_pipeline.train_all [--datasets wash lorin] [--workers 8] [--models-dir DIR]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import check_cv
+
+from .config import Config
+from .pipeline import DATASETS
+from .storage import read_table
+from .training import candidate_models, cv_settings, evaluate_final, feature_columns, save_models, compile_models
+
+REPORT_FILE = "training_report.json"
+
+# Memory-mapped arrays a worker has already opened, by path
+_shared_arrays = {}
+
+def _shared(path):
+    if path not in _shared_arrays:
+        _shared_arrays[path] = np.load(path, mmap_mode='r')
+    return _shared_arrays[path]
+
+def _fit_fold(job):
+    """Fit one candidate on one fold and score it on the held-out part"""
+    X = _shared(job['X_path'])
+    y = _shared(job['y_path'])
+    model = candidate_models(job['task'])[job['candidate']]
+    scoring, _ = cv_settings(job['task'])
+
+    start = time.perf_counter()
+    model.fit(X[job['train']], y[job['train']])
+    fit_seconds = time.perf_counter() - start
+    score = get_scorer(scoring)(model, X[job['test']], y[job['test']])
+    return {'score': float(score), 'fit_seconds': fit_seconds, 'score_seconds': time.perf_counter() - start - fit_seconds}
+
+def _fit_final(job):
+    """Fit the selected candidate on the 80/20 split, as train_model does"""
+    # A named frame, so the saved model keeps feature_names_in_ like the notebook models
+    X = pd.DataFrame(np.asarray(_shared(job['X_path'])), columns=job['features'])
+    y = pd.Series(np.asarray(_shared(job['y_path'])))
+    model = candidate_models(job['task'])[job['candidate']]
+
+    start = time.perf_counter()
+    test_metrics = evaluate_final(model, X, y, job['task'])
+    return {'model': model, 'test_metrics': test_metrics, 'fit_seconds': time.perf_counter() - start}
+
+def share_dataset(model_name, shared_dir):
+    """Write one dataset's inputs and targets as .npy files; returns its training plan"""
+    module = DATASETS[model_name]['module']
+    targets = module.CLASSIFICATION_TARGETS + module.REGRESSION_TARGETS
+    df = read_table(Config.FEATURES_DIR / module.FEATURES_FILE)
+    x_features = feature_columns(df, module.X_FEATURES, targets)
+
+    X_path = str(Path(shared_dir) / f"{model_name}_X.npy")
+    X = df[x_features].fillna(0).to_numpy(dtype=float)
+    np.save(X_path, X)
+
+    plan = {'features': x_features, 'targets': {}}
+    for task, task_targets in [('classification', module.CLASSIFICATION_TARGETS),
+                               ('regression', module.REGRESSION_TARGETS)]:
+        for target in task_targets:
+            if target not in df.columns or df[target].nunique() <= 1:
+                continue
+            y = df[target].fillna(0)
+            y = y.astype(int) if task == 'classification' else y.astype(float)
+            y_path = str(Path(shared_dir) / f"{model_name}_{target}_y.npy")
+            np.save(y_path, y.to_numpy())
+
+            _, cv = cv_settings(task)
+            # An int means the default KFold/StratifiedKFold, resolved exactly as cross_val_score does
+            cv = check_cv(cv, y, classifier=task == 'classification')
+            plan['targets'][target] = {
+                'task': task,
+                'X_path': X_path,
+                'y_path': y_path,
+                'folds': list(cv.split(X, y))
+            }
+    return plan
+
+def train_all(datasets=None, max_workers=None, models_dir=None, compile=True):
+    """Train every target of the given datasets on a process pool and save the artifacts
+
+    Writes models/*.joblib as train_targets + save_models would, plus
+    training_report.json with per-fold CV scores and fit times. Returns the report.
+    """
+    models_dir = Path(models_dir) if models_dir is not None else Config.MODELS_DIR
+    datasets = list(datasets or DATASETS)
+    max_workers = max_workers or os.cpu_count()
+    shared_dir = tempfile.mkdtemp(prefix="cypersona_train_")
+    start = time.perf_counter()
+
+    try:
+        plans = {model_name: share_dataset(model_name, shared_dir) for model_name in datasets}
+        report = {'workers': max_workers, 'datasets': {}}
+        results = {}
+        pending = {}
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            fold_jobs = []
+            for model_name, plan in plans.items():
+                for target, target_plan in plan['targets'].items():
+                    results[(model_name, target)] = {}
+                    for candidate in candidate_models(target_plan['task']):
+                        results[(model_name, target)][candidate] = [None] * len(target_plan['folds'])
+                        for fold, (train, test) in enumerate(target_plan['folds']):
+                            fold_jobs.append({
+                                'dataset': model_name, 'target': target, 'candidate': candidate, 'fold': fold,
+                                'task': target_plan['task'], 'X_path': target_plan['X_path'],
+                                'y_path': target_plan['y_path'], 'train': train, 'test': test
+                            })
+
+            # Forests dominate the runtime, so they start first and the quick linear fits fill the gaps
+            fold_jobs.sort(key=lambda job: job['candidate'] != 'rf')
+            for job in fold_jobs:
+                pending[pool.submit(_fit_fold, job)] = ('fold', job)
+            print(f"Queued {len(fold_jobs)} fold fits for {len(results)} targets on {max_workers} workers")
+
+            final = {}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, job = pending.pop(future)
+                    key = (job['dataset'], job['target'])
+
+                    if kind == 'final':
+                        final[key] = future.result()
+                        print(f"✓ {job['dataset']}/{job['target']}: {job['candidate']} fitted")
+                        continue
+
+                    results[key][job['candidate']][job['fold']] = future.result()
+                    if all(None not in folds for folds in results[key].values()):
+                        final_job = _select(key, results[key], plans[job['dataset']])
+                        pending[pool.submit(_fit_final, final_job)] = ('final', final_job)
+
+        for model_name, plan in plans.items():
+            trained_models, model_info, target_reports = {}, {}, {}
+            for target, target_plan in plan['targets'].items():
+                candidates = results[(model_name, target)]
+                best_name, best_score = _best(candidates)
+                fitted = final[(model_name, target)]
+                trained_models[target] = fitted['model']
+                model_info[target] = {'type': target_plan['task'], 'model': best_name, 'score': best_score}
+                target_reports[target] = {
+                    'type': target_plan['task'],
+                    'selected': best_name,
+                    'cv_score': best_score,
+                    'candidates': {
+                        candidate: {
+                            'cv_scores': [fold['score'] for fold in folds],
+                            'cv_mean': float(np.mean([fold['score'] for fold in folds])),
+                            'fit_seconds': sum(fold['fit_seconds'] for fold in folds)
+                        }
+                        for candidate, folds in candidates.items()
+                    },
+                    'test_metrics': {name: float(value) for name, value in fitted['test_metrics'].items()},
+                    'final_fit_seconds': fitted['fit_seconds']
+                }
+
+            save_models(model_name, trained_models, model_info, plan['features'], models_dir)
+            if compile:
+                compile_models(model_name, models_dir)
+            report['datasets'][model_name] = {'features': len(plan['features']), 'targets': target_reports}
+    finally:
+        shutil.rmtree(shared_dir, ignore_errors=True)
+
+    report['wall_seconds'] = time.perf_counter() - start
+    # Summed over jobs, so fit_seconds / wall_seconds is the effective parallelism
+    report['fit_seconds'] = sum(
+        sum(candidate['fit_seconds'] for candidate in target['candidates'].values()) + target['final_fit_seconds']
+        for dataset in report['datasets'].values() for target in dataset['targets'].values()
+    )
+    # Datasets not retrained this run keep their previous entries
+    report_path = models_dir / REPORT_FILE
+    if report_path.exists():
+        previous = json.loads(report_path.read_text()).get('datasets', {})
+        report['datasets'] = {**previous, **report['datasets']}
+    report_path.write_text(json.dumps(report, indent=2))
+    print(f"✓ Trained {len(results)} targets in {report['wall_seconds']:.1f}s "
+          f"({report['fit_seconds']:.1f}s of fitting) -> {report_path}")
+    return report
+
+def _best(candidates):
+    # Same rule as train_model: highest mean CV score, first candidate wins ties
+    best_name, best_score = None, -np.inf
+    for candidate, folds in candidates.items():
+        mean_score = float(np.mean([fold['score'] for fold in folds]))
+        if mean_score > best_score:
+            best_name, best_score = candidate, mean_score
+    return best_name, best_score
+
+def _select(key, candidates, plan):
+    model_name, target = key
+    target_plan = plan['targets'][target]
+    scoring, _ = cv_settings(target_plan['task'])
+    for candidate, folds in candidates.items():
+        mean_score = np.mean([fold['score'] for fold in folds])
+        print(f"{model_name}/{target} | {candidate.upper()} | {scoring.upper()}={mean_score:.4f}")
+
+    best_name, _ = _best(candidates)
+    return {
+        'dataset': model_name, 'target': target, 'candidate': best_name, 'task': target_plan['task'],
+        'X_path': target_plan['X_path'], 'y_path': target_plan['y_path'], 'features': plan['features']
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Train every dataset's targets on a process pool")
+    parser.add_argument("--datasets", nargs="+", choices=sorted(DATASETS), default=None)
+    parser.add_argument("--workers", type=int, default=None, help="Defaults to the number of CPUs")
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--no-compile", action="store_true", help="Skip exporting compiled evaluators")
+    args = parser.parse_args()
+
+    train_all(args.datasets, args.workers, args.models_dir, compile=not args.no_compile)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Model training shared by every dataset
+
+train_model and show_feature_importance are the notebooks' versions; the
+save helpers write the artifacts the webapp loads from models/.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.metrics import classification_report, accuracy_score, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from .config import Config
+
+WEBAPP_DIR = Config.ROOT_DIR / "webapp"
+
+def remove_column_suffixes(df, suffixes=['_encoded', '_binary', '_standardized']):
+    """Remove specified suffixes from column names for cleaner output"""
+    new_columns = {}
+
+    for col in df.columns:
+        new_col = col
+        for suffix in suffixes:
+            if col.endswith(suffix):
+                new_col = col.replace(suffix, '')
+                break
+        new_columns[col] = new_col
+
+    return df.rename(columns=new_columns)
+
+def candidate_models(task):
+    """Unfitted candidates compared for every target of a task"""
+    if task == 'classification':
+        return {
+            'rf': RandomForestClassifier(n_estimators=100, max_depth=10, class_weight='balanced', random_state=42),
+            'lr': Pipeline([('scaler', StandardScaler()),
+                           ('model', LogisticRegression(max_iter=1000, class_weight='balanced', random_state=42))])
+        }
+    return {
+        'rf': RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42),
+        'ridge': Pipeline([('scaler', StandardScaler()), ('model', Ridge(random_state=42))])
+    }
+
+def cv_settings(task):
+    """(scoring, cv) used to compare candidates"""
+    if task == 'classification':
+        return 'accuracy', StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+    return 'r2', 5
+
+def train_model(X, y, task='classification', name=''):
+    """Train and evaluate models with cross-validation"""
+    models = candidate_models(task)
+    scoring, cv = cv_settings(task)
+
+    best_model, best_score, best_name = None, -np.inf, None
+
+    for k, model in models.items():
+        scores = cross_val_score(model, X, y, cv=cv, scoring=scoring, n_jobs=-1)
+        mean_score = scores.mean()
+        print(f"{name} | {k.upper()} | {scoring.upper()}={mean_score:.4f}")
+
+        if mean_score > best_score:
+            best_model, best_score, best_name = model, mean_score, k
+
+    evaluate_final(best_model, X, y, task)
+
+    return best_model, best_score, best_name
+
+def evaluate_final(model, X, y, task):
+    """Fit on an 80/20 split and report held-out metrics; returns them as a dict"""
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, stratify=y if task=='classification' else None, test_size=0.2, random_state=42)
+
+    model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+
+    if task == 'classification':
+        accuracy = accuracy_score(y_test, y_pred)
+        print(f"Test Accuracy: {accuracy:.4f}")
+        print(classification_report(y_test, y_pred, zero_division=0))
+        return {'accuracy': accuracy}
+
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+    r2 = r2_score(y_test, y_pred)
+    print(f"Test R²: {r2:.4f}, RMSE: {rmse:.4f}")
+    return {'r2': r2, 'rmse': rmse}
+
+def show_feature_importance(model, feature_names, target_name, top_n=10):
+    """Display top feature importances"""
+    print(f"\n--- {target_name} ---")
+
+    if hasattr(model, "feature_importances_"):
+        importances = model.feature_importances_
+        fi_df = pd.DataFrame({
+            'feature': feature_names,
+            'importance': importances
+        }).sort_values('importance', ascending=False)
+        print(fi_df.head(top_n))
+
+    elif isinstance(model, Pipeline) and hasattr(model.named_steps['model'], 'coef_'):
+        coefs = np.abs(model.named_steps['model'].coef_.flatten())
+        fi_df = pd.DataFrame({
+            'feature': feature_names,
+            'coefficient': coefs
+        }).sort_values('coefficient', ascending=False)
+        print(fi_df.head(top_n))
+
+def feature_columns(df, x_features, targets):
+    """Model inputs: the explicit list, or every non-target column when it is None"""
+    if x_features is None:
+        return [f for f in df.columns if f not in targets]
+    return list(x_features)
+
+def train_targets(df, x_features, classification_targets, regression_targets):
+    """Train every target that varies; returns (trained_models, model_info)"""
+    # Parquet tables are float32; fit on float64 like the CSV-era pipeline and train_all
+    X = df[x_features].fillna(0).astype(np.float64)
+    print(f"Training models with {X.shape[1]} features, {X.shape[0]} samples")
+
+    trained_models = {}
+    model_info = {}
+
+    for task, targets in [('classification', classification_targets), ('regression', regression_targets)]:
+        for target in targets:
+            if target in df.columns and df[target].nunique() > 1:
+                y = df[target].fillna(0)
+                y = y.astype(int) if task == 'classification' else y.astype(float)
+                print(f"\n=== Training {target} ===")
+
+                model, score, name = train_model(X, y, task, target)
+                trained_models[target] = model
+                model_info[target] = {'type': task, 'model': name, 'score': score}
+
+    return trained_models, model_info
+
+def _dump(obj, path):
+    # Swap files in atomically so a running webapp keeps its memory mappings
+    tmp_path = path.with_name(path.name + ".tmp")
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+def save_models(model_name, trained_models, model_info, x_features, models_dir=None):
+    """Write per-target models, metadata and the webapp predictor; returns the paths written"""
+    models_dir = Path(models_dir) if models_dir is not None else Config.MODELS_DIR
+    models_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    for target, model in trained_models.items():
+        path = models_dir / f"{model_name}_{target}_model.joblib"
+        _dump(model, path)
+        written.append(path)
+
+    path = models_dir / f"{model_name}_metadata.joblib"
+    _dump({
+        'features': x_features,
+        'models': model_info,
+        'feature_count': len(x_features)
+    }, path)
+    written.append(path)
+
+    # The webapp unpickles its own predictor classes, which read the per-target files
+    if str(WEBAPP_DIR) not in sys.path:
+        sys.path.insert(0, str(WEBAPP_DIR))
+    from predictors import WashPredictor, OliverPredictor, LorinPredictor
+
+    predictor_classes = {'wash': WashPredictor, 'oliver': OliverPredictor, 'lorin': LorinPredictor}
+    path = models_dir / f"{model_name}_predictor.joblib"
+    _dump(predictor_classes[model_name](), path)
+    written.append(path)
+
+    return written
+
+def compile_models(model_name, models_dir=None):
+    """Refresh the webapp's compiled evaluators for one dataset's new models"""
+    if str(WEBAPP_DIR) not in sys.path:
+        sys.path.insert(0, str(WEBAPP_DIR))
+    from compiled_models import export_compiled, compiled_name
+
+    models_dir = Path(models_dir) if models_dir is not None else Config.MODELS_DIR
+    results = export_compiled(models_dir, model_names=[model_name])
+    return [models_dir / compiled_name(model_file) for model_file, status in results.items() if status == 'compiled']
@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+WEBAPP_DIR = Path(__file__).parent.parent / "webapp"
+
+if str(WEBAPP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEBAPP_DIR))
+
+@pytest.fixture(scope="session")
+def models_dir(tmp_path_factory):
+    """Small decision trees for every target of every model, fit on random features"""
+    import joblib
+    import numpy as np
+    from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+    from predictors import WashPredictor, OliverPredictor, LorinPredictor
+
+    target_dir = tmp_path_factory.mktemp("models")
+    rng = np.random.default_rng(0)
+
+    for model_name, predictor_cls in [('wash', WashPredictor), ('oliver', OliverPredictor), ('lorin', LorinPredictor)]:
+        predictor = predictor_cls()
+        X = rng.integers(-2, 4, size=(50, len(predictor.features))).astype(np.float64)
+
+        for target, model_file in predictor.model_files.items():
+            if target in predictor.classification_targets:
+                model = DecisionTreeClassifier(max_depth=3, random_state=0).fit(X, rng.integers(0, 2, size=len(X)))
+            else:
+                model = DecisionTreeRegressor(max_depth=3, random_state=0).fit(X, rng.normal(size=len(X)))
+            joblib.dump(model, target_dir / model_file)
+
+        joblib.dump(predictor, target_dir / f"{model_name}_predictor.joblib")
+
+    return target_dir
+
+@pytest.fixture(scope="session")
+def model_predictor(models_dir):
+    from predictor import ModelPredictor
+
+    return ModelPredictor(models_dir, inference_workers=1)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from config import MODEL_CONFIGS
+from feature_layout import FeatureLayout
+
+def persona(value=1):
+    return {model_name: {feature: value for feature in config['features']} for model_name, config in MODEL_CONFIGS.items()}
+
+@pytest.mark.parametrize('bad', [None, {'email_trust': 'high'}])
+def test_predict_all_fails_only_the_bad_model(model_predictor, bad):
+    parameters = persona()
+    parameters['oliver'] = bad
+
+    results = model_predictor.predict_all(parameters)
+
+    assert results['oliver'] is None
+    assert results['wash'] is not None
+    assert results['lorin'] is not None
+
+@pytest.mark.parametrize('bad', [None, {'email_trust': 'high'}])
+def test_predict_batch_fails_only_the_bad_model(model_predictor, bad):
+    good = persona()
+    bad_persona = persona()
+    bad_persona['oliver'] = bad
+
+    results = model_predictor.predict_batch([good, bad_persona])
+
+    assert results['oliver'] is None
+    assert results['wash'] and results['lorin']
+
+def test_matrix_rejects_non_numeric_values():
+    layout = FeatureLayout(['a', 'b'])
+
+    with pytest.raises(ValueError, match="b: 'high'"):
+        layout.matrix([{'a': 1, 'b': 'high'}])
+    with pytest.raises(ValueError):
+        layout.coerce(None)
+    assert layout.coerce({'a': '2', 'b': None}).tolist() == [[2.0, 0.0]]
+
+def test_predict_batch_scores_only_the_given_models(model_predictor, capsys):
+    width = len(MODEL_CONFIGS['wash']['features'])
+    results = model_predictor.predict_batch({'wash': np.zeros((3, width))}, use_cache=False)
+
+    assert list(results) == ['wash']
+    assert "No parameters provided" not in capsys.readouterr().out
@@ -1,13 +1,19 @@
 """
 Main Streamlit app for Phishing Intervention Predictor
 Minimal modular implementation with complete functionality
+
+Only streamlit and config are imported before the input form is drawn. Models
+load on a background thread and the LLM client is built on another, so the
+first paint does not wait for openai, pandas or any model file.
 """
 
-import streamlit as st
+import time
+SCRIPT_START = time.perf_counter()
+
 import os
-from llm_processor import LLMProcessor
-from predictor import ModelPredictor
-from results import display_all_results, display_parameter_summary, display_parameters_passed_to_models
+import streamlit as st
+from config import MODELS_DIR, SHOW_DIAGNOSTICS_PANEL
+from metrics import observe
 
 # Configure page
 st.set_page_config(
@@ -15,37 +21,74 @@ st.set_page_config(
     layout="wide"
 )
 
-@st.cache_resource
-def initialize_components():
-    """Initialize LLM processor and model predictor"""
-    # Get OpenAI API key
+def get_api_key():
+    """OpenAI API key from Streamlit secrets or the environment; stops the app if missing"""
     api_key = st.secrets.get("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
     if not api_key:
         st.error("OpenAI API key not found. Set OPENAI_API_KEY in secrets or environment.")
         st.stop()
+    return api_key
+
+@st.cache_resource
+def start_model_warmup():
+    """Model predictor whose models load on a background thread, shared by every session"""
+    from predictor import ModelPredictor
+    return ModelPredictor(MODELS_DIR, background=True)
+
+@st.cache_resource
+def start_neighbor_warmup():
+    """Build the nearest-respondent indexes on a background thread, once per process"""
+    import threading
+    from config import MODEL_CONFIGS
     
-    # Initialize components
-    llm_processor = LLMProcessor(api_key)
-    model_predictor = ModelPredictor()
+    def build():
+        from neighbors import get_index
+        for model_name in MODEL_CONFIGS:
+            try:
+                get_index(model_name)
+            except Exception as e:
+                print(f"✗ Error building {model_name} neighbor index: {e}")
     
-    return llm_processor, model_predictor
+    thread = threading.Thread(target=build, name="neighbor-warmup", daemon=True)
+    thread.start()
+    return thread
 
-def main():
-    st.title("Phishing Intervention Predictor")
-    st.write("AI-powered security behavior analysis using behavioral prediction models")
+@st.cache_resource
+def start_llm_warmup(api_key):
+    """Future of the LLM processor, built (and openai imported) on a background thread"""
+    from concurrent.futures import ThreadPoolExecutor
     
-    # Initialize components
-    llm_processor, model_predictor = initialize_components()
+    def build():
+        from llm_processor import LLMProcessor
+        return LLMProcessor(api_key)
     
-    # Show model status
-    model_status = model_predictor.get_model_status()
-    loaded_models = [name for name, status in model_status.items() if status['loaded']]
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-warmup")
+    future = executor.submit(build)
+    executor.shutdown(wait=False)
+    return future
+
+def display_model_status(placeholder, model_predictor):
+    """One line of per-model readiness, drawn into a placeholder so it can be redrawn"""
+    status = model_predictor.get_model_status()
+    labels = []
+    for model_name, model_status in status.items():
+        if model_status['loaded']:
+            labels.append(f"{model_name.upper()} ✓")
+        elif model_status['loading']:
+            labels.append(f"{model_name.upper()} loading...")
+        else:
+            labels.append(f"{model_name.upper()} ✗")
     
-    # st.write(f"**Loaded Models**: {', '.join(loaded_models).upper()}")
+    with placeholder.container():
+        st.caption("Models: " + " · ".join(labels))
+        if not model_predictor.is_loading() and not model_predictor.models:
+            st.error("No models loaded. Check your models directory.")
+
+def main():
+    st.title("Phishing Intervention Predictor")
+    st.write("AI-powered security behavior analysis using behavioral prediction models")
     
-    if not loaded_models:
-        st.error("No models loaded. Check your models directory.")
-        st.stop()
+    api_key = get_api_key()
     
     # Input section
     st.header("Input")
@@ -71,15 +114,36 @@ def main():
     # Analysis button
     analyze_clicked = st.button("Analyze Intervention Impact", type="primary")
     
+    observe('first_paint', time.perf_counter() - SCRIPT_START)
+    
+    # Everything below may import heavy modules; the form is already on screen
+    llm_future = start_llm_warmup(api_key)
+    model_predictor = start_model_warmup()
+    start_neighbor_warmup()
+    status_placeholder = st.empty()
+    display_model_status(status_placeholder, model_predictor)
+    
+    from results import display_all_results, display_parameter_summary, display_parameters_passed_to_models, display_sensitivity_panel, display_similar_respondents, display_diagnostics_panel
+    
     if analyze_clicked:
         if not intervention.strip() or not persona.strip():
             st.error("Please provide both intervention scenario and persona description.")
         else:
             # Process with LLM
             with st.spinner("Analyzing persona and intervention with LLM..."):
+                try:
+                    llm_processor = llm_future.result()
+                except Exception as e:
+                    # Let the next click build it again instead of re-raising this failure
+                    start_llm_warmup.clear()
+                    st.error(f"Could not start the LLM processor: {e}")
+                    st.stop()
                 parameters = llm_processor.extract_parameters(persona, intervention)
             
             if parameters:
+                # Kept across reruns so the what-if panel's widgets don't need a new extraction
+                st.session_state['parameters'] = parameters
+                
                 # Show what parameters are being passed to models
                 display_parameters_passed_to_models(parameters)
                 # st.divider()
@@ -91,11 +155,18 @@ def main():
                 
                 # Make predictions
                 with st.spinner("Generating predictions from behavioral models..."):
+                    model_predictor.wait_until_loaded()
+                    if not model_predictor.models:
+                        st.error("No models loaded. Check your models directory.")
+                        st.stop()
                     results = model_predictor.predict_all(parameters)
                 
                 # Display results
                 display_all_results(results)
                 
+                # Ground the predictions in the closest real respondents
+                display_similar_respondents(parameters)
+                
                 # Show recommendations
                 st.header("Recommendations")
                 
@@ -107,6 +178,20 @@ def main():
             
             else:
                 st.error("Failed to extract parameters from persona description. Please provide more detailed information.")
+    
+    if 'parameters' in st.session_state:
+        st.divider()
+        display_sensitivity_panel(model_predictor, st.session_state['parameters'])
+    
+    if SHOW_DIAGNOSTICS_PANEL:
+        st.divider()
+        display_diagnostics_panel()
+    
+    # Keep the status line current until loading finishes; any widget
+    # interaction interrupts this wait with a new run, as usual
+    while model_predictor.is_loading():
+        model_predictor.wait_until_loaded(timeout=0.5)
+        display_model_status(status_placeholder, model_predictor)
 
 def generate_recommendations(results):
     """Generate simple recommendations based on prediction results"""
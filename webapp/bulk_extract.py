@@ -0,0 +1,226 @@
+"""
+Bulk persona parameter extraction with bounded concurrency and rate limiting
+
+Reads persona records (CSV or JSONL with id and persona columns, plus either an
+intervention column or one shared intervention text) and writes one JSON line
+per record to the output file as soon as it finishes. Re-running with the same
+output file skips records that already succeeded, so a crashed run resumes.
+
+Usage:
+    python bulk_extract.py employees.csv results.jsonl --intervention "Quarterly simulation..."
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from llm_processor import LLMProcessor, ExtractionError
+
+# Rough completion size of a persona-stage JSON response, the larger of the two stages
+COMPLETION_TOKENS_ESTIMATE = 2000
+
+def estimate_tokens(prompt):
+    """Cheap token estimate (about 4 characters per token) plus the expected completion"""
+    return len(prompt) // 4 + COMPLETION_TOKENS_ESTIMATE
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """Block until amount tokens are available, then take them"""
+        # Requests larger than the bucket would never fit; let them drain it instead
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait_time = (amount - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+class BulkExtractor:
+    def __init__(self, processor, output_path, max_in_flight=8, requests_per_minute=500,
+                 tokens_per_minute=200000, max_retries=4, backoff_base=2.0):
+        self.processor = processor
+        self.output_path = Path(output_path)
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+
+        # Every API request, including hedged ones, draws from both quotas
+        self.processor.rate_limiter = self._acquire_quota
+
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def _acquire_quota(self, model, prompt):
+        self.request_bucket.acquire(1)
+        self.token_bucket.acquire(estimate_tokens(prompt))
+
+    def completed_ids(self):
+        """Record ids that already have a successful result in the output file"""
+        done = set()
+        if not self.output_path.exists():
+            return done
+
+        with open(self.output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line
+                    continue
+                if 'parameters' in result:
+                    done.add(str(result['id']))
+        return done
+
+    async def run(self, records):
+        """Extract parameters for every record not already in the output file"""
+        done = self.completed_ids()
+        queue = asyncio.Queue(maxsize=self.max_in_flight * 2)
+        write_lock = asyncio.Lock()
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="bulk-extract")
+        start = time.perf_counter()
+
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_path, "a", encoding="utf-8") as out:
+            async def worker():
+                while True:
+                    record = await queue.get()
+                    if record is None:
+                        return
+                    result = await self._extract_with_retry(record, executor)
+                    async with write_lock:
+                        out.write(json.dumps(result) + "\n")
+                        out.flush()
+                        self._report_progress(start)
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.max_in_flight)]
+
+            for record in records:
+                if str(record['id']) in done:
+                    self.skipped += 1
+                    continue
+                await queue.put(record)
+
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+
+        executor.shutdown()
+        elapsed = time.perf_counter() - start
+        print(f"Finished: {self.completed} extracted, {self.failed} failed, "
+              f"{self.skipped} already done in {elapsed:.1f}s")
+        return {'completed': self.completed, 'failed': self.failed, 'skipped': self.skipped, 'elapsed': elapsed}
+
+    async def _extract_with_retry(self, record, executor):
+        loop = asyncio.get_running_loop()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                parameters = await loop.run_in_executor(
+                    executor, self._extract, record['persona'], record['intervention']
+                )
+                self.completed += 1
+                return {'id': record['id'], 'parameters': parameters}
+
+            except ExtractionError as e:
+                error = str(e)
+                if attempt < self.max_retries:
+                    # Exponential backoff with full jitter
+                    delay = random.uniform(0, self.backoff_base * 2 ** attempt)
+                    print(f"Record {record['id']} failed ({error}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+        self.failed += 1
+        return {'id': record['id'], 'error': error}
+
+    def _extract(self, persona, intervention):
+        return self.processor.extract_parameters(persona, intervention, raise_on_failure=True)
+
+    def _report_progress(self, start):
+        finished = self.completed + self.failed
+        if finished % 25 == 0:
+            rate = finished / max(time.perf_counter() - start, 1e-9)
+            print(f"{finished} records processed ({rate * 60:.0f}/min)")
+
+def read_records(input_path, intervention=None, id_column="id", persona_column="persona",
+                 intervention_column="intervention"):
+    """Yield {'id', 'persona', 'intervention'} records from a CSV or JSONL file"""
+    input_path = Path(input_path)
+
+    if input_path.suffix == ".jsonl":
+        with open(input_path, encoding="utf-8") as f:
+            rows = (json.loads(line) for line in f if line.strip())
+            yield from _to_records(rows, intervention, id_column, persona_column, intervention_column)
+    else:
+        yield from _to_records(_csv_rows(input_path), intervention, id_column, persona_column, intervention_column)
+
+def _csv_rows(input_path, chunk_size=1000):
+    """Rows of a CSV file as dicts, read in chunks, with blank cells as None"""
+    import pandas as pd
+    for chunk in pd.read_csv(input_path, chunksize=chunk_size, dtype=str):
+        yield from chunk.astype(object).where(chunk.notna(), None).to_dict("records")
+
+def _to_records(rows, intervention, id_column, persona_column, intervention_column):
+    # Rows without an id (absent or blank) fall back to their position in the whole file
+    for index, row in enumerate(rows):
+        record_id = row.get(id_column)
+        yield {
+            'id': record_id if record_id not in (None, "") else index,
+            'persona': row[persona_column],
+            'intervention': intervention if intervention is not None else row[intervention_column]
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk persona parameter extraction")
+    parser.add_argument("input", help="CSV or JSONL file of persona records")
+    parser.add_argument("output", help="JSONL file to append results to (also used to resume)")
+    parser.add_argument("--intervention", help="Intervention text shared by every record")
+    parser.add_argument("--id-column", default="id")
+    parser.add_argument("--persona-column", default="persona")
+    parser.add_argument("--intervention-column", default="intervention")
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=500, help="Requests-per-minute quota")
+    parser.add_argument("--tpm", type=int, default=200000, help="Tokens-per-minute quota")
+    parser.add_argument("--max-retries", type=int, default=4)
+    args = parser.parse_args()
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        parser.error("OPENAI_API_KEY is not set")
+
+    extractor = BulkExtractor(
+        LLMProcessor(api_key),
+        args.output,
+        max_in_flight=args.max_in_flight,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        max_retries=args.max_retries
+    )
+    records = read_records(
+        args.input, args.intervention, args.id_column, args.persona_column, args.intervention_column
+    )
+    asyncio.run(extractor.run(records))
+
+if __name__ == "__main__":
+    main()
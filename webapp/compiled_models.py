@@ -0,0 +1,334 @@
+"""
+Compiled array evaluators for the saved target estimators
+
+A random forest is flattened into one set of contiguous node arrays covering
+every tree, and all trees are walked together with a few vectorized NumPy
+steps per depth level instead of Python-level calls per tree. Scaler plus
+linear pipelines are reduced to their mean, scale, coefficient and intercept
+arrays. Evaluators reproduce the estimator's own float operations in the same
+order, so their output is bit-for-bit identical; export only writes
+artifacts that pass that check on the training features.
+
+Usage:
+    python compiled_models.py export [--models-dir DIR]
+    python compiled_models.py verify [--models-dir DIR]
+"""
+
+import os
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+COMPILED_SUFFIX = ".compiled.joblib"
+
+def compiled_name(model_file):
+    """Artifact name of the compiled form of a model file"""
+    return model_file[:-len(".joblib")] + COMPILED_SUFFIX if model_file.endswith(".joblib") else model_file + COMPILED_SUFFIX
+
+class CompiledForest:
+    """Random forest classifier or regressor evaluated from flat node arrays"""
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        # Plain ndarray views of memory-mapped arrays skip np.memmap's per-operation overhead
+        self.left = np.asarray(arrays['left'])
+        self.right = np.asarray(arrays['right'])
+        self.feature = np.asarray(arrays['feature'])
+        self.threshold = np.asarray(arrays['threshold'])
+        self.missing_left = np.asarray(arrays['missing_left'])
+        self.value = np.asarray(arrays['value'])
+        self.roots = np.asarray(arrays['roots'])
+        self.max_depth = int(arrays['max_depth'])
+        self.n_features_in_ = int(arrays['n_features_in'])
+        if 'classes' in arrays:
+            self.classes_ = np.asarray(arrays['classes'])
+
+    def apply(self, X):
+        """Leaf node index reached in every tree, shape (n_rows, n_trees)"""
+        # Trees split on float32 features, exactly as sklearn casts its input
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.roots.shape[0]))
+        check_missing = bool(np.isnan(X).any())
+
+        # Leaves point to themselves, so a fixed number of steps settles every tree
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = x <= self.threshold[nodes]
+            if check_missing:
+                missing = np.isnan(x)
+                go_left = np.where(missing, self.missing_left[nodes], go_left)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return nodes
+
+    def _accumulate(self, X):
+        leaf_values = self.value[self.apply(X)]
+        # Running sum over trees in estimator order matches the forest's += loop
+        total = np.cumsum(leaf_values, axis=1)[:, -1]
+        total /= self.roots.shape[0]
+        return total
+
+    def predict_proba(self, X):
+        return self._accumulate(X)
+
+    def predict(self, X):
+        if hasattr(self, 'classes_'):
+            return self.classes_.take(np.argmax(self._accumulate(X), axis=1), axis=0)
+        return self._accumulate(X)
+
+class CompiledLinear:
+    """Optional standard scaling followed by a linear regressor or logistic classifier"""
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.mean = np.asarray(arrays['mean']) if 'mean' in arrays else None
+        self.scale = np.asarray(arrays['scale']) if 'scale' in arrays else None
+        self.coef = np.asarray(arrays['coef'])
+        self.intercept = arrays['intercept']
+        self.n_features_in_ = int(arrays['n_features_in'])
+        if 'classes' in arrays:
+            self.classes_ = np.asarray(arrays['classes'])
+
+    def decision_function(self, X):
+        X = np.array(X, dtype=np.float64)
+        if self.mean is not None:
+            X -= self.mean
+        if self.scale is not None:
+            X /= self.scale
+        coef = self.coef.T if self.coef.ndim == 2 else self.coef
+        scores = X @ coef + self.intercept
+        if scores.ndim > 1 and scores.shape[1] == 1:
+            scores = scores.reshape(-1)
+        return scores
+
+    def predict_proba(self, X):
+        from scipy.special import expit
+
+        # Binary logistic regression only; compile_estimator rejects multiclass
+        scores = self.decision_function(X)
+        expit(scores, out=scores)
+        return np.stack([1 - scores, scores], axis=1)
+
+    def predict(self, X):
+        scores = self.decision_function(X)
+        if not hasattr(self, 'classes_'):
+            return scores
+        return self.classes_.take((scores > 0).astype(int), axis=0)
+
+EVALUATORS = {'forest': CompiledForest, 'linear': CompiledLinear}
+
+def compile_estimator(model):
+    """Flatten a fitted estimator into an evaluator, or return None if unsupported"""
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    from sklearn.linear_model import LinearRegression, LogisticRegression, Ridge
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    if isinstance(model, (RandomForestClassifier, RandomForestRegressor)):
+        if getattr(model, 'n_outputs_', 1) != 1:
+            return None
+        return CompiledForest(_flatten_forest(model))
+
+    scaler = None
+    if isinstance(model, Pipeline):
+        steps = [step for _, step in model.steps if step is not None and step != 'passthrough']
+        if len(steps) == 2 and isinstance(steps[0], StandardScaler):
+            scaler, model = steps
+        elif len(steps) == 1:
+            model = steps[0]
+        else:
+            return None
+
+    if isinstance(model, (LinearRegression, Ridge, LogisticRegression)):
+        if isinstance(model, LogisticRegression) and len(model.classes_) != 2:
+            return None
+        arrays = {
+            'coef': np.asarray(model.coef_),
+            'intercept': np.asarray(model.intercept_) if np.ndim(model.intercept_) else model.intercept_,
+            'n_features_in': np.int64(model.n_features_in_)
+        }
+        if scaler is not None:
+            if scaler.with_mean:
+                arrays['mean'] = scaler.mean_
+            if scaler.with_std:
+                arrays['scale'] = scaler.scale_
+        if hasattr(model, 'classes_'):
+            arrays['classes'] = model.classes_
+        return CompiledLinear(arrays)
+
+    return None
+
+def _flatten_forest(forest):
+    """Concatenate every tree's node arrays with node indices offset per tree"""
+    is_classifier = hasattr(forest, 'classes_')
+    n_classes = len(forest.classes_) if is_classifier else 0
+    raw_proba = _stores_leaf_proba(forest) if is_classifier else False
+
+    left, right, feature, threshold, missing_left, values, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        node_ids = np.arange(n_nodes)
+        is_leaf = tree.children_left == -1
+
+        # Leaves loop back to themselves so extra traversal steps are no-ops
+        left.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        right.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        # Trees from sklearn without missing-value support never send NaN left
+        missing_left.append(np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(n_nodes)), dtype=bool))
+
+        if is_classifier:
+            proba = tree.value[:, 0, :n_classes]
+            if not raw_proba:
+                # Older sklearn stores counts and normalizes them in predict_proba
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                proba = proba / normalizer
+            values.append(proba)
+        else:
+            values.append(tree.value[:, 0, 0])
+
+        roots.append(offset)
+        offset += n_nodes
+        max_depth = max(max_depth, tree.max_depth)
+
+    arrays = {
+        'left': np.concatenate(left).astype(np.intp),
+        'right': np.concatenate(right).astype(np.intp),
+        'feature': np.concatenate(feature).astype(np.intp),
+        'threshold': np.concatenate(threshold),
+        'missing_left': np.concatenate(missing_left),
+        'value': np.ascontiguousarray(np.concatenate(values)),
+        'roots': np.array(roots, dtype=np.intp),
+        'max_depth': np.int64(max_depth),
+        'n_features_in': np.int64(forest.n_features_in_)
+    }
+    if is_classifier:
+        arrays['classes'] = forest.classes_
+    return arrays
+
+def _stores_leaf_proba(forest):
+    """Whether tree predict_proba returns stored leaf values as is
+
+    sklearn changed from storing class counts to storing fractions; probe one
+    tree instead of trusting version numbers.
+    """
+    estimator = forest.estimators_[0]
+    n_classes = len(forest.classes_)
+    probe = np.zeros((1, forest.n_features_in_), dtype=np.float32)
+    leaf = estimator.apply(probe)
+    stored = estimator.tree_.value[leaf, 0, :n_classes]
+    return np.array_equal(estimator.predict_proba(probe), stored)
+
+def save_compiled(evaluator, path):
+    """Write an evaluator's arrays uncompressed so they can be memory-mapped"""
+    path = Path(path)
+    payload = {'kind': 'forest' if isinstance(evaluator, CompiledForest) else 'linear', 'arrays': evaluator.arrays}
+    tmp_path = path.with_name(path.name + ".tmp")
+    joblib.dump(payload, tmp_path, compress=0)
+    os.replace(tmp_path, path)
+
+def load_compiled(path, mmap_mode='r'):
+    """Load a compiled artifact; with mmap_mode its node arrays stay in the page cache"""
+    payload = joblib.load(path, mmap_mode=mmap_mode)
+    return EVALUATORS[payload['kind']](payload['arrays'])
+
+def verify_compiled(model, evaluator, X):
+    """Whether the evaluator reproduces predict (and predict_proba) exactly on X"""
+    if not np.array_equal(model.predict(X), evaluator.predict(X)):
+        return False
+    if hasattr(model, 'predict_proba') and hasattr(evaluator, 'classes_'):
+        return np.array_equal(model.predict_proba(X), evaluator.predict_proba(X))
+    return True
+
+def load_features(model_name):
+    """Training feature matrix of a dataset, in MODEL_CONFIGS column order"""
+    from config import FEATURES_DIR, MODEL_CONFIGS
+    from feature_store import read_table, table_columns
+
+    config = MODEL_CONFIGS[model_name]
+    path = FEATURES_DIR / config['features_file']
+    available = set(table_columns(path))
+    data = read_table(path, [feature for feature in config['features'] if feature in available])
+    # Parquet tables are float32; verify on the float64 inputs the webapp scores
+    return data.reindex(columns=config['features'], fill_value=0).fillna(0).astype(np.float64)
+
+def export_compiled(models_dir=None, save=True, model_names=None):
+    """Compile every target estimator, verify it on its dataset, and save those that match
+
+    model_names limits the export to some datasets, e.g. ['wash']. Returns {model_file: status} with status 'compiled', 'mismatch',
+    'unsupported' or 'missing'.
+    """
+    from model_registry import DEFAULT_MODELS_DIR
+    from predictors import WashPredictor, OliverPredictor, LorinPredictor
+
+    models_dir = Path(models_dir) if models_dir is not None else DEFAULT_MODELS_DIR
+    predictors = {'wash': WashPredictor, 'oliver': OliverPredictor, 'lorin': LorinPredictor}
+    results = {}
+
+    for model_name, predictor_class in predictors.items():
+        if model_names is not None and model_name not in model_names:
+            continue
+        X = load_features(model_name).to_numpy()
+        # Random rows around the data on top of the real ones, to reach rarely used leaves
+        rng = np.random.default_rng(0)
+        probe = rng.normal(size=(64, X.shape[1])) * X.std(axis=0) + X.mean(axis=0)
+        X = np.vstack([X, probe])
+
+        for model_file in predictor_class().model_files.values():
+            model_path = models_dir / model_file
+            if not model_path.exists():
+                results[model_file] = 'missing'
+                continue
+
+            model = joblib.load(model_path)
+            evaluator = compile_estimator(model)
+            if evaluator is None:
+                results[model_file] = 'unsupported'
+                print(f"✗ {model_file}: {type(model).__name__} is not supported")
+                continue
+
+            X_model = _frame(X, model) if hasattr(model, 'feature_names_in_') else X
+            if not verify_compiled(model, evaluator, X_model):
+                results[model_file] = 'mismatch'
+                print(f"✗ {model_file}: compiled output differs, keeping the estimator")
+                continue
+
+            start = time.perf_counter()
+            for row in X[:100]:
+                evaluator.predict(row[np.newaxis, :])
+            per_row = (time.perf_counter() - start) / min(len(X), 100)
+
+            if save:
+                save_compiled(evaluator, models_dir / compiled_name(model_file))
+            results[model_file] = 'compiled'
+            print(f"✓ {model_file}: bit-exact on {len(X)} rows, {per_row * 1e6:.0f} µs per row")
+
+    return results
+
+def _frame(X, model):
+    """Wrap a matrix with the estimator's feature names to keep sklearn from warning"""
+    import pandas as pd
+    return pd.DataFrame(X, columns=model.feature_names_in_)
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    sys.path.insert(0, str(Path(__file__).parent))
+
+    parser = argparse.ArgumentParser(description="Compile target estimators to array evaluators")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--models-dir", default=None)
+    args = parser.parse_args()
+
+    results = export_compiled(args.models_dir, save=args.command == "export")
+    sys.exit(0 if all(status != 'mismatch' for status in results.values()) else 1)
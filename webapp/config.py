@@ -2,6 +2,9 @@
 Configuration with prompt for better intervention vs persona parameter mapping
 """
 
+import os
+from pathlib import Path
+
 # WASH 2021 Model Features (73 total)
 WASH_FEATURES = [
     # Demographics (5)
@@ -77,22 +80,96 @@ LORIN_FEATURES = [
     'knowledge_total', 'proficiency'
 ]
 
-# LLM prompt with correct intervention vs persona parameter mapping
-PERSONA_ANALYSIS_PROMPT = """
-You are an expert cybersecurity behavioral analyst. Analyze the PERSONA and INTERVENTION separately to extract parameters for phishing behavior prediction models.
+# Which parameters each extraction stage produces; together they cover every model feature
+PERSONA_PARAMETERS = {
+    'wash': [
+        # Demographics
+        'age_category', 'gender', 'education_level', 'employment_status', 'annual_income',
+        # IT background & history
+        'has_it_training', 'has_it_job',
+        'previous_incidents_phishing_email', 'previous_incidents_data_breach',
+        'previous_incidents_computer_virus', 'previous_incidents_device_hacked',
+        'previous_incidents_credit_card_fraud', 'previous_incidents_identity_theft',
+        'previous_incidents_any',
+        # Digital literacy (personal knowledge)
+        'digital_literacy_wiki', 'digital_literacy_meme', 'digital_literacy_phishing',
+        'digital_literacy_bookmark', 'digital_literacy_cache', 'digital_literacy_ssl',
+        'digital_literacy_ajax', 'digital_literacy_rss', 'digital_literacy_other',
+        'digital_literacy_total',
+        # Emotional responses (personality-based)
+        'emotion_dread', 'emotion_terror', 'emotion_anxiety', 'emotion_nervous',
+        'emotion_scared', 'emotion_panic', 'emotion_fear', 'emotion_worry',
+        'emotion_total',
+        # Personal behaviors and traits
+        'investigated_sender', 'investigated_links', 'investigated_external',
+        'noticed_sender_issues', 'noticed_content_issues', 'noticed_technical_issues',
+        'suspicion_confidence', 'overall_suspicion', 'perceived_harm',
+        # Email usage patterns
+        'email_recency', 'email_account_work', 'email_account_student', 'email_account_personal',
+        'email_content_work_related', 'email_content_personal',
+        'email_sender_work_colleague', 'email_sender_friend_family',
+        'email_sender_acquaintance', 'email_sender_organization',
+        'sender_relationship_duration', 'expected_this_email', 'felt_similar_before',
+        'previous_sender_emails', 'previous_sender_interaction', 'email_seemed_different'
+    ],
+    'oliver': [
+        # Demographics
+        'age_category', 'gender', 'education_level', 'employment_status',
+        # IT background
+        'it_job', 'phishing_victim', 'phishing_victim_count',
+        # Personal perceptions
+        'perceived_knowledge', 'perceived_self_efficacy', 'email_trust'
+    ],
+    'lorin': [
+        # Demographics
+        'age_category', 'education_level', 'it_experience', 'email_frequency',
+        # Big Five personality traits
+        'personality_extraversion', 'personality_agreeableness', 
+        'personality_conscientiousness', 'personality_neuroticism', 'personality_openness',
+        # Personal security attitudes
+        'pre_security_engagement', 'pre_security_attentiveness', 
+        'pre_security_resistance', 'pre_security_concern', 'pre_security_attitude_total',
+        # Personal capabilities
+        'knowledge_total', 'proficiency'
+    ]
+}
+
+INTERVENTION_PARAMETERS = {
+    'wash': [
+        # Email issue detection patterns (what intervention teaches to recognize)
+        'sender_issues_none', 'sender_issues_name_different', 'sender_issues_email_different',
+        'subject_line_issues_none', 'subject_line_issues_different',
+        'email_body_issues_none', 'email_body_issues_typos', 'email_body_issues_missing',
+        'email_body_issues_strange', 'email_body_issues_more_info', 'email_body_issues_less_info',
+        # Typical phishing characteristics (intervention scenarios)
+        'actions_requested_click_link', 'actions_requested_open_attachment',
+        'actions_requested_respond_info', 'actions_requested_external_action'
+    ],
+    'oliver': [
+        # PMT threat perceptions (intervention context)
+        'perceived_severity', 'perceived_vulnerability'
+    ],
+    'lorin': [
+        # Training provision
+        'security_training_prior'
+    ]
+}
+
+# LLM prompts, one per extraction stage. Persona and intervention are extracted
+# independently so each result can be cached and reused across pairings.
+PERSONA_EXTRACTION_PROMPT = """
+You are an expert cybersecurity behavioral analyst. Analyze the PERSONA to extract the person-specific parameters for phishing behavior prediction models.
 
 **PERSONA DESCRIPTION**: {persona}
-**INTERVENTION SCENARIO**: {intervention}
 
 CRITICAL INSTRUCTIONS:
-1. PERSONA → Personal characteristics, traits, behaviors, knowledge, attitudes
-2. INTERVENTION → Scenario context (threat characteristics, what's being simulated/tested)
+PERSONA → Personal characteristics, traits, behaviors, knowledge, attitudes.
+Scenario parameters (what a phishing email or training contains) are extracted separately; do not include them.
 
-Extract realistic values for ALL parameters. Use the mapping guidance below:
+Extract realistic values for ALL parameters below:
 
 === WASH 2021 MODEL (Real incident behavior) ===
 
-**FROM PERSONA** (Personal traits, knowledge & behaviors):
 Demographics & Background:
 - age_category: 1-5 (1=18-25, 2=26-35, 3=36-45, 4=46-55, 5=56+)
 - gender: 0-1 (0=female, 1=male)  
@@ -126,21 +203,8 @@ Email Usage Patterns (person's work/life context):
 - expected_this_email: 0-1, felt_similar_before: 1-5
 - previous_sender_emails: 0-1, previous_sender_interaction: 0-1, email_seemed_different: 1-5
 
-**FROM INTERVENTION** (Scenario being simulated/tested):
-Email Characteristics (what the intervention contains):
-- actions_requested_click_link: 0-1 (intervention asks to click links)
-- actions_requested_open_attachment: 0-1 (intervention includes attachments)
-- actions_requested_respond_info: 0-1 (intervention requests information)
-- actions_requested_external_action: 0-1 (intervention requests external action)
-
-Email Issue Patterns (what the intervention simulates):
-- sender_issues_none: 0-1, sender_issues_name_different: 0-1, sender_issues_email_different: 0-1
-- subject_line_issues_none: 0-1, subject_line_issues_different: 0-1
-- email_body_issues_*: 0-1 (what issues the intervention email contains)
-
 === OLIVER 2022 MODEL (Competence assessment) ===
 
-**FROM PERSONA** (Personal characteristics & perceptions):
 Demographics: age_category, gender, education_level, employment_status (same as WASH)
 IT Background: it_job: 0-1, phishing_victim: 0-1, phishing_victim_count: -2 to 2
 
@@ -149,14 +213,8 @@ PMT Personal Perceptions - standardized -2 to 2:
 - perceived_self_efficacy: Person's confidence in handling threats
 - email_trust: Person's general trust in email communications
 
-**FROM INTERVENTION** (Threat context being assessed):
-PMT Threat Characteristics - standardized -2 to 2:
-- perceived_severity: Severity of threats in intervention scenario
-- perceived_vulnerability: Vulnerability level tested by intervention
-
 === LORIN 2025 MODEL (Personality-based) ===
 
-**FROM PERSONA** (Personal characteristics):
 Demographics: age_category, education_level, it_experience, email_frequency
 
 Big Five Personality (inherent traits) - standardized -2 to 2:
@@ -174,37 +232,164 @@ Personal Capabilities - standardized -2 to 2:
 - knowledge_total: Person's security knowledge level
 - proficiency: Person's security skill level
 
-**FROM INTERVENTION** (Training provision):
+**MAPPING EXAMPLES:**
+- "cautious accountant, detail-oriented" → investigated_sender=1, personality_conscientiousness=1
+- "tech-savvy developer, confident" → perceived_knowledge=1, digital_literacy_total=1
+
+Respond with ONLY a JSON object containing all 84 persona parameters:
+{{
+  "wash": {{all 58 persona parameters}},
+  "oliver": {{all 10 persona parameters}},
+  "lorin": {{all 16 persona parameters}}
+}}
+"""
+
+INTERVENTION_EXTRACTION_PROMPT = """
+You are an expert cybersecurity behavioral analyst. Analyze the INTERVENTION to extract the scenario parameters for phishing behavior prediction models.
+
+**INTERVENTION SCENARIO**: {intervention}
+
+CRITICAL INSTRUCTIONS:
+INTERVENTION → Scenario context (threat characteristics, what's being simulated/tested).
+Personal characteristics of the recipient are extracted separately; do not include them.
+
+Extract realistic values for ALL parameters below:
+
+=== WASH 2021 MODEL (Real incident behavior) ===
+
+Email Characteristics (what the intervention contains):
+- actions_requested_click_link: 0-1 (intervention asks to click links)
+- actions_requested_open_attachment: 0-1 (intervention includes attachments)
+- actions_requested_respond_info: 0-1 (intervention requests information)
+- actions_requested_external_action: 0-1 (intervention requests external action)
+
+Email Issue Patterns (what the intervention simulates):
+- sender_issues_none: 0-1, sender_issues_name_different: 0-1, sender_issues_email_different: 0-1
+- subject_line_issues_none: 0-1, subject_line_issues_different: 0-1
+- email_body_issues_*: 0-1 (what issues the intervention email contains)
+
+=== OLIVER 2022 MODEL (Competence assessment) ===
+
+PMT Threat Characteristics - standardized -2 to 2:
+- perceived_severity: Severity of threats in intervention scenario
+- perceived_vulnerability: Vulnerability level tested by intervention
+
+=== LORIN 2025 MODEL (Personality-based) ===
+
+Training provision:
 - security_training_prior: 0-1 (whether intervention provides/includes training)
 
 **MAPPING EXAMPLES:**
-- Persona: "cautious accountant, detail-oriented" → investigated_sender=1, personality_conscientiousness=1
-- Intervention: "phishing email with urgent payment request" → actions_requested_click_link=1, perceived_severity=1
-- Persona: "tech-savvy developer, confident" → perceived_knowledge=1, digital_literacy_total=1
-- Intervention: "quarterly simulation with training" → security_training_prior=1
+- "phishing email with urgent payment request" → actions_requested_click_link=1, perceived_severity=1
+- "quarterly simulation with training" → security_training_prior=1
 
-Respond with ONLY a JSON object containing all 102 parameters:
+Respond with ONLY a JSON object containing all 18 intervention parameters:
 {{
-  "wash": {{all 73 parameters}},
-  "oliver": {{all 12 parameters}},
-  "lorin": {{all 17 parameters}}
+  "wash": {{all 15 intervention parameters}},
+  "oliver": {{all 2 intervention parameters}},
+  "lorin": {{all 1 intervention parameters}}
 }}
 """
 
+# Processed training features written by the data_pipeline notebooks
+FEATURES_DIR = Path(__file__).parent.parent / "data" / "features"
+
 MODEL_CONFIGS = {
     'wash': {
         'features': WASH_FEATURES,
         'predictor_file': 'wash_predictor.joblib',
-        'metadata_file': 'wash_metadata.joblib'
+        'metadata_file': 'wash_metadata.joblib',
+        'features_file': 'wash_2021_ml_optimized.csv'
     },
     'oliver': {
         'features': OLIVER_FEATURES,
         'predictor_file': 'oliver_predictor.joblib',
-        'metadata_file': 'oliver_metadata.joblib'
+        'metadata_file': 'oliver_metadata.joblib',
+        'features_file': 'oliver_2022_ml_optimized.csv'
     },
     'lorin': {
         'features': LORIN_FEATURES,
         'predictor_file': 'lorin_predictor.joblib',
-        'metadata_file': 'lorin_metadata.joblib'
+        'metadata_file': 'lorin_metadata.joblib',
+        'features_file': 'lorin_2025_ml_optimized.csv'
     }
-}
\ No newline at end of file
+}
+
+# Models directory used by the app; None auto-detects ../models (see ModelPredictor)
+MODELS_DIR = os.getenv("CYPERSONA_MODELS_DIR") or None
+
+# joblib mmap_mode for model artifacts: 'r' maps numpy arrays (compiled evaluators, linear models)
+# so processes share them; sklearn forests copy their tree arrays on load and stay private. None maps nothing
+MODEL_MMAP_MODE = 'r'
+
+# Score with verified compiled evaluators (compiled_models.py export) when they exist,
+# for batches of up to COMPILED_MAX_ROWS rows; larger batches use the sklearn estimator
+USE_COMPILED_MODELS = True
+COMPILED_MAX_ROWS = 100
+
+# Predictions kept per distinct feature vector, and how often artifacts are checked for changes
+PREDICTION_CACHE_SIZE = 10000
+PREDICTION_CACHE_CHECK_SECONDS = 1.0
+# Larger batches skip the cache by default; per-row hashing costs more than it saves
+PREDICTION_CACHE_MAX_ROWS = 32
+
+# Grid points for continuous features in what-if sensitivity sweeps (see sensitivity.py)
+SENSITIVITY_POINTS = 9
+
+# Real respondents shown next to each prediction (see neighbors.py)
+NEIGHBOR_COUNT = 5
+
+# Rows per chunk when streaming large feature files through score_file.py
+SCORE_CHUNK_SIZE = 10000
+
+# Rows per chunk when mapping KnowBe4 campaign exports (knowbe4_adapter.py)
+KNOWBE4_CHUNK_SIZE = 50000
+
+# Bind address of the headless prediction service (service.py)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8000
+
+# Threads shared by ModelPredictor to score target estimators concurrently (1 = sequential)
+INFERENCE_WORKERS = min(4, os.cpu_count() or 1)
+
+# LLM models in order of preference, raced with hedged requests (see llm_processor.py)
+LLM_MODELS = ["gpt-4o", "gpt-4-turbo", "gpt-3.5-turbo"]
+LLM_HEDGE_DELAY_SECONDS = 8.0  # start the next model if no usable answer by then
+LLM_REQUEST_BUDGET_SECONDS = 45.0  # overall deadline for one extraction
+
+# Show per-stage timings and counters (metrics.py) at the bottom of the app
+SHOW_DIAGNOSTICS_PANEL = os.getenv("CYPERSONA_DIAGNOSTICS", "") == "1"
+
+# Persistent cache for LLM parameter extraction (see llm_cache.py)
+LLM_CACHE_PATH = Path(__file__).parent / ".cache" / "llm_extractions.sqlite"
+LLM_CACHE_MAX_ENTRIES = 5000
+LLM_CACHE_TTL_SECONDS = None  # None keeps entries until evicted by LRU
+
+# Valid value of every feature as (JSON type, minimum, maximum), following the
+# prompt guidance. Drives the structured-output schema and response validation.
+_ORDINAL_RANGES = {
+    'age_category': (1, 5),
+    'education_level': (1, 4),
+    'annual_income': (1, 4),
+    'email_recency': (1, 5),
+    'sender_relationship_duration': (1, 6),
+    'felt_similar_before': (1, 5),
+    'email_seemed_different': (1, 5),
+    'it_experience': (1, 4),
+    'email_frequency': (1, 5)
+}
+_STANDARDIZED_PREFIXES = ('digital_literacy_', 'emotion_', 'perceived_', 'personality_', 'pre_security_')
+_STANDARDIZED_FEATURES = {'suspicion_confidence', 'phishing_victim_count', 'email_trust', 'knowledge_total', 'proficiency'}
+
+FEATURE_RANGES = {}
+for _features in (WASH_FEATURES, OLIVER_FEATURES, LORIN_FEATURES):
+    for _feature in _features:
+        if _feature in _ORDINAL_RANGES:
+            FEATURE_RANGES[_feature] = ('integer',) + _ORDINAL_RANGES[_feature]
+        elif _feature.startswith(_STANDARDIZED_PREFIXES) or _feature in _STANDARDIZED_FEATURES:
+            FEATURE_RANGES[_feature] = ('number', -2, 2)
+        else:
+            FEATURE_RANGES[_feature] = ('integer', 0, 1)
+
+# Models that accept a strict JSON schema; the rest are asked for a JSON object
+STRUCTURED_OUTPUT_MODELS = {"gpt-4o"}
@@ -0,0 +1,82 @@
+"""
+Precomputed column layouts for writing parameters straight into feature arrays
+
+A FeatureLayout maps each feature of a model to its column once, so parameter
+dicts are written into a preallocated float64 array instead of being turned
+into a DataFrame, reindexed and filled on every call. Missing, None and NaN
+values become 0, as reindex(fill_value=0).fillna(0) did.
+"""
+
+import numpy as np
+
+class FeatureLayout:
+    def __init__(self, features):
+        self.features = tuple(features)
+        self.index = {feature: i for i, feature in enumerate(self.features)}
+        self.width = len(self.features)
+
+    def matrix(self, rows):
+        """(len(rows), width) array from a list of {feature: value} dicts
+
+        Raises ValueError for a row that is not a dict or a value that is not
+        numeric, so callers can fail just the model it was meant for.
+        """
+        X = np.zeros((len(rows), self.width))
+        index = self.index
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                raise ValueError(f"Expected a dict of feature values, got {type(row).__name__}")
+            out = X[i]
+            for feature, value in row.items():
+                column = index.get(feature)
+                if column is not None and value is not None:
+                    try:
+                        out[column] = value
+                    except (TypeError, ValueError):
+                        raise ValueError(f"Non-numeric value for {feature}: {value!r}") from None
+        return _zero_nan(X)
+
+    def vector(self, row):
+        """One {feature: value} dict as a (1, width) array"""
+        return self.matrix([row])
+
+    def from_frame(self, df):
+        """Layout-ordered array of a DataFrame; absent columns are 0"""
+        positions = df.columns.get_indexer(self.features)
+        present = positions >= 0
+        if present.all():
+            X = df.iloc[:, positions].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        else:
+            X = np.zeros((len(df), self.width))
+            X[:, present] = df.iloc[:, positions[present]].to_numpy(dtype=np.float64, na_value=np.nan)
+        return _zero_nan(X)
+
+    def coerce(self, input_data):
+        """A dict, list of dicts, DataFrame or array (already in layout order) as a float64 matrix"""
+        if input_data is None:
+            raise ValueError("No feature values given")
+        if isinstance(input_data, dict):
+            return self.vector(input_data)
+        if isinstance(input_data, list) and (not input_data or input_data[0] is None or isinstance(input_data[0], dict)):
+            return self.matrix(input_data)
+        if hasattr(input_data, 'columns'):
+            return self.from_frame(input_data)
+
+        X = np.array(input_data, dtype=np.float64, ndmin=2)
+        if X.shape[1] != self.width:
+            raise ValueError(f"Expected {self.width} feature columns, got {X.shape[1]}")
+        return _zero_nan(X)
+
+def _zero_nan(X):
+    X[np.isnan(X)] = 0
+    return X
+
+_LAYOUTS = {}
+
+def get_layout(model_name):
+    """Shared layout of a model's MODEL_CONFIGS feature list"""
+    layout = _LAYOUTS.get(model_name)
+    if layout is None:
+        from config import MODEL_CONFIGS
+        layout = _LAYOUTS[model_name] = FeatureLayout(MODEL_CONFIGS[model_name]['features'])
+    return layout
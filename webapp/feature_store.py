@@ -0,0 +1,40 @@
+"""
+Reader for the data pipeline's feature tables
+
+The pipeline writes each table as CSV and as Parquet with compact dtypes
+(int8 flags and categories, float32 scores). Readers here take either path,
+use the newer copy (Parquet on a tie) and parse only the columns asked for.
+This is the only reader: data_pipeline/storage.py re-exports it rather than
+keeping its own copy, since the webapp is deployed without the pipeline.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+SUFFIXES = ('.parquet', '.csv')
+
+def resolve_table(path):
+    """Existing copy of a table to read: the newer of .parquet and .csv, preferring Parquet"""
+    existing = [Path(path).with_suffix(suffix) for suffix in SUFFIXES if Path(path).with_suffix(suffix).exists()]
+    if not existing:
+        raise FileNotFoundError(f"No .parquet or .csv table at {Path(path).with_suffix('')}")
+    # max keeps the first of equal mtimes, which is the Parquet copy
+    return max(existing, key=lambda candidate: candidate.stat().st_mtime_ns)
+
+def table_columns(path):
+    """Column names of a table without reading its rows"""
+    path = resolve_table(path)
+    if path.suffix == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).schema_arrow.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def read_table(path, columns=None):
+    """Load a table, parsing only the requested columns (returned in the requested order)"""
+    path = resolve_table(path)
+    if path.suffix == '.parquet':
+        df = pd.read_parquet(path, columns=columns)
+    else:
+        df = pd.read_csv(path, usecols=columns)
+    return df[list(columns)] if columns is not None else df
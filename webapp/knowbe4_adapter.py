@@ -0,0 +1,279 @@
+"""
+Streaming adapter from KnowBe4 phishing campaign exports to model features
+
+A KnowBe4 export (see data/raw_data/knowbe4_synthesized.csv) has one row per
+user per campaign. Only the columns listed in SOURCE_COLUMNS are parsed, in
+fixed-size chunks, and each chunk is mapped onto the WASH, Oliver and Lorin
+feature schemas with column-wise NumPy transforms. Features the export says
+nothing about (age, personality, emotions, ...) get the same defaults as an
+LLM extraction that left them out. Campaign outcomes (Clicked, Reported, ...)
+are labels, not features; they are carried alongside as observed columns.
+
+Scores such as failure counts are standardized like the training features.
+By default the mean and standard deviation come from a first streaming pass
+over the same export; pass a saved standardization to score several exports
+on one scale.
+
+Usage:
+    python knowbe4_adapter.py export.csv output_dir [--features-only] [--chunk-size 50000]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from config import MODEL_CONFIGS, FEATURE_RANGES, KNOWBE4_CHUNK_SIZE
+from parameter_schema import default_feature_value
+
+ID_COLUMNS = ['User ID', 'Campaign Name']
+OUTCOME_COLUMNS = {
+    'Clicked': 'observed_clicked',
+    'Reported': 'observed_reported',
+    'Time to Click (seconds)': 'observed_time_to_click',
+    'Time to Report (seconds)': 'observed_time_to_report'
+}
+SOURCE_COLUMNS = ID_COLUMNS + list(OUTCOME_COLUMNS) + [
+    'Department', 'Title', 'Template', 'Difficulty', 'Delivery Status',
+    'Previous Training Completed', 'Failure Count (12 months)',
+    'Security Awareness Proficiency', 'Baseline Test Score', 'Last Training Score'
+]
+
+PROFICIENCY_LEVELS = {'Novice': 1, 'Intermediate': 2, 'Advanced': 3}
+TITLE_INCOME = {'Executive': 4, 'Director': 4, 'Manager': 3, 'Employee': 2, 'Admin': 2, 'Contractor': 2}
+
+# WASH email features set to 1 by each campaign template
+TEMPLATE_FEATURES = {
+    'System Maintenance': ['email_sender_organization', 'actions_requested_click_link'],
+    'Account Suspended': ['email_sender_organization', 'actions_requested_click_link'],
+    'Account Verification': ['email_sender_organization', 'actions_requested_click_link', 'actions_requested_respond_info'],
+    'Security Alert': ['email_sender_organization', 'actions_requested_click_link'],
+    'VPN Access': ['email_sender_organization', 'actions_requested_click_link'],
+    'Meeting Invitation': ['email_sender_work_colleague', 'actions_requested_click_link'],
+    'Package Delivery': ['email_sender_organization', 'actions_requested_click_link', 'email_content_personal'],
+    'Software Update': ['email_sender_organization', 'actions_requested_external_action'],
+    'HR Communication': ['email_sender_organization', 'actions_requested_open_attachment'],
+    'Financial Request': ['email_sender_work_colleague', 'actions_requested_respond_info', 'actions_requested_external_action'],
+    'Survey Request': ['email_sender_organization', 'actions_requested_click_link'],
+    'Document Share': ['email_sender_work_colleague', 'actions_requested_open_attachment'],
+    'IT Support': ['email_sender_organization', 'actions_requested_respond_info'],
+    'Password Expiration': ['email_sender_organization', 'actions_requested_click_link']
+}
+
+# Red flags left in the email by KnowBe4 difficulty; harder templates have none
+DIFFICULTY_ISSUES = {
+    'Low': ['sender_issues_email_different', 'email_body_issues_typos', 'email_body_issues_strange'],
+    'Medium': ['sender_issues_email_different'],
+    'High': []
+}
+ISSUE_GROUPS = {
+    'sender_issues_none': 'sender_issues_',
+    'subject_line_issues_none': 'subject_line_issues_',
+    'email_body_issues_none': 'email_body_issues_'
+}
+
+# Source scores that feed standardized features
+STANDARDIZED_SOURCES = ['failure_count', 'proficiency', 'knowledge_score']
+
+def source_scores(chunk):
+    """Numeric source scores of a chunk, before standardization"""
+    knowledge = chunk['Last Training Score'].astype(float).fillna(chunk['Baseline Test Score'].astype(float))
+    return {
+        'failure_count': chunk['Failure Count (12 months)'].to_numpy(dtype=float),
+        'proficiency': chunk['Security Awareness Proficiency'].map(PROFICIENCY_LEVELS).to_numpy(dtype=float),
+        'knowledge_score': knowledge.to_numpy(dtype=float)
+    }
+
+def fit_standardization(input_path, chunk_size=None):
+    """Mean and standard deviation of each standardized source, in one streaming pass"""
+    from score_file import read_chunks
+
+    columns = ['Failure Count (12 months)', 'Security Awareness Proficiency', 'Baseline Test Score', 'Last Training Score']
+    totals = {name: np.zeros(3) for name in STANDARDIZED_SOURCES}
+
+    for chunk in read_chunks(input_path, columns, chunk_size or KNOWBE4_CHUNK_SIZE):
+        for name, values in source_scores(chunk).items():
+            values = values[~np.isnan(values)]
+            totals[name] += (len(values), values.sum(), np.square(values).sum())
+
+    standardization = {}
+    for name, (count, total, squares) in totals.items():
+        mean = total / count if count else 0.0
+        variance = squares / count - mean ** 2 if count else 0.0
+        standardization[name] = (float(mean), float(np.sqrt(max(variance, 0.0))) or 1.0)
+    return standardization
+
+def map_chunk(chunk, standardization):
+    """Map one chunk of export rows to {model_name: feature DataFrame} in MODEL_CONFIGS order"""
+    n = len(chunk)
+    scores = source_scores(chunk)
+    standardized = {
+        name: np.nan_to_num((values - standardization[name][0]) / standardization[name][1])
+        for name, values in scores.items()
+    }
+
+    is_it = (chunk['Department'] == 'IT').to_numpy(dtype=float)
+    trained = chunk['Previous Training Completed'].fillna(False).astype(bool).to_numpy(dtype=float)
+    phished = (scores['failure_count'] > 0).astype(float)
+    proficiency = np.nan_to_num(scores['proficiency'], nan=PROFICIENCY_LEVELS['Intermediate'])
+    title = chunk['Title']
+
+    values = {
+        'wash': {
+            'employment_status': (title != 'Contractor').to_numpy(dtype=float),
+            'annual_income': title.map(TITLE_INCOME).fillna(2).to_numpy(dtype=float),
+            'has_it_job': is_it,
+            'has_it_training': trained,
+            'previous_incidents_phishing_email': phished,
+            'previous_incidents_any': phished,
+            # Campaigns go to the work mailbox
+            'email_account_work': np.ones(n),
+            'email_account_personal': np.zeros(n),
+            'email_content_work_related': np.ones(n)
+        },
+        'oliver': {
+            'employment_status': (title != 'Contractor').to_numpy(dtype=float),
+            'it_job': is_it,
+            'phishing_victim': phished,
+            'phishing_victim_count': standardized['failure_count'],
+            'perceived_knowledge': standardized['proficiency']
+        },
+        'lorin': {
+            'it_experience': np.where(is_it == 1, 4, proficiency),
+            'security_training_prior': trained,
+            'knowledge_total': standardized['knowledge_score'],
+            'proficiency': standardized['proficiency']
+        }
+    }
+
+    template = chunk['Template'].to_numpy()
+    for name, features in TEMPLATE_FEATURES.items():
+        matches = (template == name).astype(float)
+        for feature in features:
+            values['wash'][feature] = np.maximum(values['wash'].get(feature, np.zeros(n)), matches)
+    # Personal-content templates are not work-related
+    values['wash']['email_content_work_related'] = 1 - values['wash'].get('email_content_personal', np.zeros(n))
+
+    difficulty = chunk['Difficulty'].to_numpy()
+    for level, features in DIFFICULTY_ISSUES.items():
+        matches = (difficulty == level).astype(float)
+        for feature in features:
+            values['wash'][feature] = np.maximum(values['wash'].get(feature, np.zeros(n)), matches)
+    for none_feature, prefix in ISSUE_GROUPS.items():
+        flagged = [v for f, v in values['wash'].items() if f.startswith(prefix) and f != none_feature]
+        values['wash'][none_feature] = 1 - np.max(flagged, axis=0) if flagged else np.ones(n)
+
+    frames = {}
+    for model_name, config in MODEL_CONFIGS.items():
+        features = config['features']
+        matrix = np.tile(np.array([default_feature_value(f) for f in features], dtype=float), (n, 1))
+        for column, feature in enumerate(features):
+            if feature in values[model_name]:
+                matrix[:, column] = values[model_name][feature]
+        # Same bounds an LLM extraction is clamped to
+        ranges = np.array([FEATURE_RANGES[f][1:] for f in features], dtype=float)
+        np.clip(matrix, ranges[:, 0], ranges[:, 1], out=matrix)
+        frames[model_name] = pd.DataFrame(matrix, columns=features, index=chunk.index)
+
+    return frames
+
+def iter_mapped_chunks(input_path, chunk_size=None, standardization=None, include_bounced=False):
+    """Yield (ids, observed, {model_name: features}) per chunk of a KnowBe4 export
+
+    Bounced emails never reached the user and are skipped unless include_bounced is set.
+    """
+    from score_file import input_columns, read_chunks
+
+    missing = [column for column in SOURCE_COLUMNS if column not in set(input_columns(input_path))]
+    if missing:
+        raise ValueError(f"Not a KnowBe4 export, missing columns: {', '.join(missing)}")
+
+    chunk_size = chunk_size or KNOWBE4_CHUNK_SIZE
+    if standardization is None:
+        standardization = fit_standardization(input_path, chunk_size)
+
+    for chunk in read_chunks(input_path, SOURCE_COLUMNS, chunk_size):
+        if not include_bounced:
+            chunk = chunk[chunk['Delivery Status'] != 'Bounced']
+            if chunk.empty:
+                continue
+
+        observed = chunk[list(OUTCOME_COLUMNS)].rename(columns=OUTCOME_COLUMNS)
+        yield chunk[ID_COLUMNS], observed, map_chunk(chunk, standardization)
+
+def convert_export(input_path, output_dir, score=True, chunk_size=None, standardization=None,
+                   models_dir=None, output_format="csv"):
+    """Stream an export into one file per model: predictions (default) or mapped features
+
+    Each output row carries the export's ids and observed outcomes. Returns
+    {'rows', 'elapsed', 'rows_per_second', 'standardization'}.
+    """
+    from score_file import ChunkWriter, PREDICTOR_CLASSES, predictions_frame
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    chunk_size = chunk_size or KNOWBE4_CHUNK_SIZE
+    if standardization is None:
+        standardization = fit_standardization(input_path, chunk_size)
+
+    predictors = {}
+    if score:
+        for model_name, predictor_class in PREDICTOR_CLASSES.items():
+            predictors[model_name] = predictor_class(models_dir)
+            predictors[model_name].load_models()
+
+    suffix = "predictions" if score else "features"
+    writers = {
+        model_name: ChunkWriter(output_dir / f"{model_name}_knowbe4_{suffix}.{output_format}")
+        for model_name in MODEL_CONFIGS
+    }
+
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for ids, observed, frames in iter_mapped_chunks(input_path, chunk_size, standardization):
+            for model_name, features in frames.items():
+                if score:
+                    output = predictions_frame(predictors[model_name].predict_batch(features), features.index)
+                else:
+                    output = features
+                writers[model_name].write(pd.concat([ids, observed, output], axis=1))
+
+            rows += len(ids)
+            elapsed = time.perf_counter() - start
+            print(f"{rows:,} rows converted ({rows / max(elapsed, 1e-9):,.0f} rows/s)", flush=True)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    with open(output_dir / "knowbe4_standardization.json", "w", encoding="utf-8") as f:
+        json.dump(standardization, f, indent=2)
+
+    elapsed = time.perf_counter() - start
+    rate = rows / max(elapsed, 1e-9)
+    print(f"✓ Converted {rows:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s) -> {output_dir}")
+    return {'rows': rows, 'elapsed': elapsed, 'rows_per_second': rate, 'standardization': standardization}
+
+def main():
+    parser = argparse.ArgumentParser(description="Map a KnowBe4 export to model features and score it")
+    parser.add_argument("input", help="KnowBe4 export (CSV or Parquet)")
+    parser.add_argument("output_dir")
+    parser.add_argument("--features-only", action="store_true", help="Write mapped features instead of predictions")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--standardization", help="JSON from an earlier run, to reuse its scaling")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--models-dir", default=None)
+    args = parser.parse_args()
+
+    standardization = None
+    if args.standardization:
+        with open(args.standardization, encoding="utf-8") as f:
+            standardization = {name: tuple(stats) for name, stats in json.load(f).items()}
+
+    convert_export(args.input, args.output_dir, score=not args.features_only, chunk_size=args.chunk_size,
+                   standardization=standardization, models_dir=args.models_dir, output_format=args.format)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Persistent content-addressed cache for LLM parameter extraction
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+def normalize_text(text):
+    """Collapse whitespace and case so trivially different inputs share a key"""
+    return " ".join((text or "").split()).casefold()
+
+def prompt_version(prompt_template):
+    """Short fingerprint of a prompt template; editing the prompt invalidates old entries"""
+    return hashlib.sha256(prompt_template.encode("utf-8")).hexdigest()[:16]
+
+class ExtractionCache:
+    def __init__(self, path, max_entries=5000, ttl_seconds=None):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON extractions (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(stage, text, version, model):
+        payload = json.dumps([stage, normalize_text(text), version, model])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, stage, text, version, models):
+        """Return (model, parsed) for the first preferred model with a live entry, else None"""
+        keys = {self.make_key(stage, text, version, model): model for model in models}
+        now = time.time()
+
+        with self._lock:
+            placeholders = ",".join("?" * len(keys))
+            rows = self._conn.execute(
+                f"SELECT key, value, created_at FROM extractions WHERE key IN ({placeholders})",
+                list(keys)
+            ).fetchall()
+            found = {key: (value, created_at) for key, value, created_at in rows}
+
+            for key, model in keys.items():
+                if key not in found:
+                    continue
+                value, created_at = found[key]
+                if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                    self._conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                    self._conn.commit()
+                    continue
+
+                self._conn.execute("UPDATE extractions SET last_access = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits += 1
+                return model, json.loads(value)
+
+            self.misses += 1
+            return None
+
+    def put(self, stage, text, version, model, parsed):
+        """Store a parsed response and evict least recently used entries past max_entries"""
+        key = self.make_key(stage, text, version, model)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, model, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, json.dumps(parsed), now, now)
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM extractions WHERE key IN "
+                    "(SELECT key FROM extractions ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM extractions")
+            self._conn.commit()
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds
+        }
@@ -3,78 +3,234 @@ Fixed LLM processor with working OpenAI model
 """
 
 import json
-import re
-from openai import OpenAI
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from llm_cache import ExtractionCache, prompt_version
+from metrics import span, inc, observe
+from parameter_schema import build_response_format, validate_parameters, default_feature_value
+
+class ExtractionError(RuntimeError):
+    """No model produced usable parameters within the request budget"""
 
 class LLMProcessor:
-    def __init__(self, api_key):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key, cache=None, hedge_delay=None, request_budget=None, client=None):
+        from config import LLM_HEDGE_DELAY_SECONDS, LLM_REQUEST_BUDGET_SECONDS
+        
+        # Any object with chat.completions.create, e.g. an offline fake for benchmarks
+        if client is None:
+            # The openai package takes most of a second to import; only pay for it when used
+            from openai import OpenAI
+            client = OpenAI(api_key=api_key)
+        self.client = client
+        self.hedge_delay = LLM_HEDGE_DELAY_SECONDS if hedge_delay is None else hedge_delay
+        self.request_budget = LLM_REQUEST_BUDGET_SECONDS if request_budget is None else request_budget
+        
+        # Which model answered the last request per stage, and how often each model has won
+        self.last_extraction = {}
+        self.model_wins = Counter()
+        
+        # Optional callable(model, prompt) invoked before every API request, e.g. a rate limiter
+        self.rate_limiter = None
+        
+        # Pass cache=False to always call the API
+        if cache is None:
+            from config import LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS
+            cache = ExtractionCache(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS)
+        self.cache = cache or None
+    
+    def extract_parameters(self, persona, intervention, raise_on_failure=False):
+        """Extract parameters using available OpenAI model
+
+        Persona and intervention are extracted as two independently cached
+        stages and merged, so a persona analyzed once is reused with every
+        intervention (and vice versa). Falls back to default parameters for a
+        stage when every model fails, unless raise_on_failure is set, in which
+        case ExtractionError is raised.
+        """
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-stage") as executor:
+            persona_future = executor.submit(self.extract_persona, persona)
+            intervention_future = executor.submit(self.extract_intervention, intervention)
+            persona_params = persona_future.result()
+            intervention_params = intervention_future.result()
+        
+        if raise_on_failure and (persona_params is None or intervention_params is None):
+            raise ExtractionError("All models failed to return usable parameters")
+        
+        return self._expand_parameters(self._merge_stages(persona_params, intervention_params))
+    
+    def extract_persona(self, persona):
+        """Persona-derived parameters only, or None if no model answered"""
+        from config import PERSONA_EXTRACTION_PROMPT, PERSONA_PARAMETERS
+        return self._extract_stage('persona', persona, PERSONA_EXTRACTION_PROMPT, PERSONA_PARAMETERS)
+    
+    def extract_intervention(self, intervention):
+        """Intervention-derived parameters only, or None if no model answered"""
+        from config import INTERVENTION_EXTRACTION_PROMPT, INTERVENTION_PARAMETERS
+        return self._extract_stage('intervention', intervention, INTERVENTION_EXTRACTION_PROMPT, INTERVENTION_PARAMETERS)
+    
+    def extract_matrix(self, personas, interventions, max_workers=4):
+        """Parameters for every persona × intervention pair with only M + K stage extractions
+
+        Returns a nested list where result[i][j] pairs personas[i] with interventions[j].
+        """
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-matrix") as executor:
+            persona_params = list(executor.map(self.extract_persona, personas))
+            intervention_params = list(executor.map(self.extract_intervention, interventions))
+        
+        return [
+            [self._expand_parameters(self._merge_stages(p, i)) for i in intervention_params]
+            for p in persona_params
+        ]
+    
+    def _extract_stage(self, stage, text, prompt_template, stage_parameters):
+        """Run one cached, hedged extraction stage and return its validated fields"""
+        from config import LLM_MODELS
+        prompt = prompt_template.format(**{stage: text})
+        version = prompt_version(prompt_template)
+        start = time.perf_counter()
+        
+        parsed = None
+        if self.cache is not None:
+            cached = self.cache.get(stage, text, version, LLM_MODELS)
+            if cached:
+                model, parsed = cached
+                inc('llm_cache_hits', stage=stage)
+                self._record_extraction(stage, model, start, cached=True)
+            else:
+                inc('llm_cache_misses', stage=stage)
+        
+        if parsed is None:
+            # Models in order of preference, hedged against slow or hung responses
+            model, parsed = self._hedged_request(prompt, LLM_MODELS, stage, stage_parameters)
+            self._record_extraction(stage, model, start, cached=False)
+            if not parsed:
+                print(f"✗ All models failed for {stage}, using defaults")
+                inc('llm_fallbacks', stage=stage)
+                return None
+            if self.cache is not None:
+                self.cache.put(stage, text, version, model, parsed)
+        
+        # Cheap enough to re-run on cached entries written before schema validation
+        return validate_parameters(parsed, stage_parameters)
+    
+    def _merge_stages(self, persona_params, intervention_params):
+        """Combine stage outputs into one {model: {feature: value}} dict"""
+        merged = {}
+        for stage_params in (persona_params or {}, intervention_params or {}):
+            for model_name, values in stage_params.items():
+                merged.setdefault(model_name, {}).update(values)
+        return merged
     
-    def extract_parameters(self, persona, intervention):
-        """Extract parameters using available OpenAI model"""
-        print("Analyzing with OpenAI...")
-        
-        # Use the complete detailed prompt from config.py
-        from config import PERSONA_ANALYSIS_PROMPT
-        prompt = PERSONA_ANALYSIS_PROMPT.format(
-            persona=persona,
-            intervention=intervention
+    def _request_model(self, model, prompt, timeout, stage, stage_parameters):
+        """Single schema-constrained completion request; raises unless the response validates"""
+        from config import STRUCTURED_OUTPUT_MODELS
+        response_format = build_response_format(
+            f"{stage}_parameters", stage_parameters, strict=model in STRUCTURED_OUTPUT_MODELS
         )
         
-        # Try multiple models in order of preference
-        models = ["gpt-4o", "gpt-4-turbo", "gpt-3.5-turbo"]
+        if self.rate_limiter is not None:
+            self.rate_limiter(model, prompt)
         
-        for model in models:
-            try:
-                print(f"Trying {model}...")
+        try:
+            with span('llm_request', model=model, stage=stage):
                 response = self.client.chat.completions.create(
                     model=model,
                     messages=[{"role": "user", "content": prompt}],
-                    temperature=0.1
+                    temperature=0.1,
+                    response_format=response_format,
+                    timeout=timeout
                 )
-                
-                content = response.choices[0].message.content.strip()
-                print(f"Got response from {model}")
-                
-                # Parse JSON
-                parsed = self._extract_json(content)
-                if parsed:
-                    expanded = self._expand_parameters(parsed)
-                    print("✓ Successfully extracted parameters")
-                    return expanded
-                    
-            except Exception as e:
-                print(f"Model {model} failed: {e}")
-                continue
-        
-        print("All models failed, using defaults")
-        return self._get_defaults()
+        except Exception:
+            inc('llm_requests', model=model, outcome='error')
+            raise
+        
+        content = response.choices[0].message.content.strip()
+        parsed = self._extract_json(content, stage_parameters)
+        if not parsed:
+            inc('llm_requests', model=model, outcome='invalid')
+            raise ValueError("response did not match the parameter schema")
+        inc('llm_requests', model=model, outcome='ok')
+        return parsed
     
-    def _extract_json(self, content):
-        """Extract JSON robustly"""
-        # Try direct parsing first
-        try:
-            return json.loads(content)
-        except:
-            pass
-        
-        # Find JSON in text
-        patterns = [
-            r'```json\s*(\{.*?\})\s*```',
-            r'```\s*(\{.*?\})\s*```',
-            r'(\{[^{}]*\{.*?\}[^{}]*\})',
-            r'(\{.*?\})'
-        ]
+    def _hedged_request(self, prompt, models, stage, stage_parameters):
+        """Race models with staggered starts within the request budget
+
+        The first model starts immediately. The next one starts once the
+        hedge delay passes without a usable answer, or as soon as an earlier
+        model fails. The first response that parses wins. Returns
+        (model, parsed), or (None, None) if nothing usable arrives before
+        the deadline.
+        """
+        deadline = time.monotonic() + self.request_budget
+        remaining = list(models)
+        pending = {}
+        next_launch = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=len(models), thread_name_prefix="llm-hedge")
         
-        for pattern in patterns:
-            matches = re.findall(pattern, content, re.DOTALL)
-            for match in matches:
-                try:
-                    return json.loads(match.strip())
-                except:
-                    continue
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    print(f"✗ Request budget of {self.request_budget:.0f}s exhausted")
+                    break
+                
+                if remaining and now >= next_launch:
+                    model = remaining.pop(0)
+                    if pending:
+                        inc('llm_hedges', model=model)
+                    # Each request's own timeout ends at the shared deadline
+                    future = executor.submit(
+                        self._request_model, model, prompt, deadline - now, stage, stage_parameters
+                    )
+                    pending[future] = model
+                    next_launch = now + self.hedge_delay
+                
+                if not pending:
+                    break
+                
+                wake_at = min(deadline, next_launch) if remaining else deadline
+                done, _ = wait(pending, timeout=max(0.0, wake_at - time.monotonic()), return_when=FIRST_COMPLETED)
+                
+                # Prefer the earlier model if several finish together
+                for future in sorted(done, key=lambda f: models.index(pending[f])):
+                    model = pending.pop(future)
+                    try:
+                        return model, future.result()
+                    except Exception as e:
+                        print(f"Model {model} failed: {e}")
+                        next_launch = time.monotonic()
+        finally:
+            # Abandoned requests cannot be interrupted; their timeout bounds them
+            executor.shutdown(wait=False, cancel_futures=True)
         
-        return None
+        return None, None
+    
+    def _record_extraction(self, stage, model, start, cached):
+        latency = time.perf_counter() - start
+        self.last_extraction[stage] = {
+            'model': model,
+            'cached': cached,
+            'latency': latency
+        }
+        observe('llm_extraction', latency, stage=stage, source='cache' if cached else 'api',
+                status='ok' if model is not None else 'error')
+        if model is not None and not cached:
+            self.model_wins[model] += 1
+    
+    def _extract_json(self, content, stage_parameters):
+        """Parse a JSON-mode response and validate it against the stage schema"""
+        with span('json_parse'):
+            try:
+                parsed = json.loads(content)
+            except json.JSONDecodeError:
+                inc('llm_parse_failures', reason='invalid_json')
+                return None
+            
+            validated = validate_parameters(parsed, stage_parameters)
+        if validated is None:
+            inc('llm_parse_failures', reason='schema')
+        return validated
     
     def _expand_parameters(self, core_params):
         """Use LLM output directly without expansion since it should be complete"""
@@ -83,24 +239,18 @@ class LLMProcessor:
         from config import MODEL_CONFIGS
         
         result = {}
-        for model_name, config in MODEL_CONFIGS.items():
-            result[model_name] = {}
-            model_params = core_params.get(model_name, {})
-            
-            # Fill all required features
-            for feature in config['features']:
-                if feature in model_params:
-                    result[model_name][feature] = model_params[feature]
-                else:
-                    # Default based on feature type
-                    if 'issues_none' in feature or 'email_account_personal' in feature:
-                        result[model_name][feature] = 1
-                    elif any(x in feature for x in ['category', 'level', 'recency']):
-                        result[model_name][feature] = 3
-                    elif 'gender' in feature:
-                        result[model_name][feature] = 0
+        with span('parameter_expansion'):
+            for model_name, config in MODEL_CONFIGS.items():
+                result[model_name] = {}
+                model_params = core_params.get(model_name, {})
+                
+                # Fill all required features
+                for feature in config['features']:
+                    if feature in model_params:
+                        result[model_name][feature] = model_params[feature]
                     else:
-                        result[model_name][feature] = 0
+                        # Default based on feature type
+                        result[model_name][feature] = default_feature_value(feature)
         
         return result
     
@@ -123,4 +273,8 @@ class LLMProcessor:
                     'total': total,
                     'completeness': extracted / total if total > 0 else 0
                 }
-        return summary
\ No newline at end of file
+        return summary
+    
+    def get_cache_stats(self):
+        """Hit/miss counters for the extraction cache"""
+        return self.cache.stats() if self.cache is not None else None
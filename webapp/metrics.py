@@ -0,0 +1,176 @@
+"""
+Process-wide timing spans and counters, exportable as Prometheus text
+
+Spans are recorded as histograms named cypersona_<name>_seconds with a status
+label ('ok' or 'error'); counters as cypersona_<name>_total. A bounded window
+of recent durations per span also gives the percentiles shown in the
+diagnostics panel.
+
+    with span('llm_request', model='gpt-4o', stage='persona'):
+        ...
+    inc('llm_fallbacks', stage='persona')
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+PREFIX = "cypersona_"
+
+# Seconds; covers microsecond target inference up to slow LLM requests
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+DESCRIPTIONS = {
+    'llm_request': "One chat completion request",
+    'llm_extraction': "One persona or intervention extraction stage, cached or not",
+    'json_parse': "Parsing and validating one LLM response",
+    'parameter_expansion': "Filling every model feature from extracted parameters",
+    'model_load': "Loading one model artifact from disk",
+    'target_inference': "Scoring one target's model",
+    'predict_all': "Scoring every model for one persona",
+    'model_warmup': "Loading every model when a predictor starts",
+    'first_paint': "Streamlit script start until the input form is rendered",
+    'llm_requests': "Chat completion requests by outcome",
+    'llm_parse_failures': "LLM responses that were not valid JSON or did not match the schema",
+    'llm_fallbacks': "Extraction stages that fell back to defaults because every model failed",
+    'llm_hedges': "Requests started on a fallback model while an earlier one was still pending",
+    'llm_cache_hits': "Extraction stages served from the extraction cache",
+    'llm_cache_misses': "Extraction stages that needed an API request",
+    'prediction_cache_hits': "Feature vectors served from the prediction cache",
+    'prediction_cache_misses': "Feature vectors that had to be scored",
+    'model_load_failures': "Model artifacts that failed to load",
+    'target_failures': "Target models that raised while scoring a batch"
+}
+
+class Metrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS, recent=1000):
+        self.buckets = tuple(buckets)
+        self.recent = recent
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._spans = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            series = self._spans.get(key)
+            if series is None:
+                series = self._spans[key] = {
+                    'count': 0, 'sum': 0.0, 'buckets': [0] * len(self.buckets), 'recent': deque(maxlen=self.recent)
+                }
+            series['count'] += 1
+            series['sum'] += seconds
+            series['recent'].append(seconds)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series['buckets'][i] += 1
+                    break
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time the enclosed block; an exception is recorded with status='error' and re-raised"""
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, status=status, **labels)
+
+    def snapshot(self):
+        """Counters and span summaries as plain dicts, for display or JSON"""
+        import numpy as np
+
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            spans = []
+            for (name, labels), series in sorted(self._spans.items()):
+                recent = np.fromiter(series['recent'], dtype=float)
+                spans.append({
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': series['count'],
+                    'mean_ms': series['sum'] / series['count'] * 1e3,
+                    'p50_ms': float(np.percentile(recent, 50) * 1e3),
+                    'p95_ms': float(np.percentile(recent, 95) * 1e3),
+                    'p99_ms': float(np.percentile(recent, 99) * 1e3)
+                })
+        return {'counters': counters, 'spans': spans}
+
+    def export_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            spans = [(key, dict(self._spans[key], buckets=list(self._spans[key]['buckets']))) for key in sorted(self._spans)]
+
+        described = set()
+        for (name, labels), value in counters:
+            metric = f"{PREFIX}{name}_total"
+            if metric not in described:
+                described.add(metric)
+                lines.append(f"# HELP {metric} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), series in spans:
+            metric = f"{PREFIX}{name}_seconds"
+            if metric not in described:
+                described.add(metric)
+                lines.append(f"# HELP {metric} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(self.buckets, series['buckets']):
+                cumulative += count
+                lines.append(f"{metric}_bucket{_format_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{metric}_bucket{_format_labels(labels + (('le', '+Inf'),))} {series['count']}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {_format_value(series['sum'])}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {series['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._spans.clear()
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = [
+        f'{key}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels
+    ]
+    return "{" + ",".join(escaped) + "}"
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+METRICS = Metrics()
+
+def span(name, **labels):
+    """Time a block on the process-wide registry"""
+    return METRICS.span(name, **labels)
+
+def inc(name, amount=1, **labels):
+    """Increment a counter on the process-wide registry"""
+    METRICS.inc(name, amount, **labels)
+
+def observe(name, seconds, **labels):
+    """Record an already measured duration on the process-wide registry"""
+    METRICS.observe(name, seconds, **labels)
@@ -0,0 +1,304 @@
+"""
+Resident model registry so every target estimator is unpickled once per process
+
+Artifacts are loaded with joblib mmap_mode, so plain numpy arrays in
+uncompressed joblib files are memory-mapped and shared between serving
+processes through the page cache. That covers compiled evaluators and linear
+models, but not sklearn forests: Tree.__setstate__ copies the node arrays into
+private buffers, so each process still holds its own copy of every tree.
+"""
+
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from metrics import inc, observe
+
+DEFAULT_MODELS_DIR = Path(__file__).parent.parent / "models"
+
+class ModelRegistry:
+    def __init__(self, models_dir=None, mmap_mode='r', use_compiled=True, compiled_max_rows=100):
+        self.models_dir = Path(models_dir) if models_dir is not None else DEFAULT_MODELS_DIR
+        self.mmap_mode = mmap_mode
+        self.use_compiled = use_compiled
+        self.compiled_max_rows = compiled_max_rows
+        self._models = {}
+        self._evaluators = {}
+        self._stats = {}
+        # Reentrant: get_evaluator falls back to get while holding it
+        self._lock = threading.RLock()
+
+    def get(self, model_file):
+        """Return the resident estimator for a model file, loading it on first use"""
+        model = self._models.get(model_file)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(model_file)
+            if model is None:
+                model = self._load(model_file)
+        return model
+
+    def get_evaluator(self, model_file, rows=None):
+        """Return what should score a model file: its compiled evaluator if exported, else the estimator
+
+        Compiled artifacts (see compiled_models.py) are only used when they are
+        at least as new as the estimator they were verified against. They win
+        on small batches only; above compiled_max_rows rows the estimator is
+        faster and avoids a rows x trees x classes leaf array, so it is loaded
+        (once) and returned instead.
+        """
+        if rows is not None and rows > self.compiled_max_rows:
+            return self.get(model_file)
+
+        evaluator = self._evaluators.get(model_file)
+        if evaluator is not None:
+            return evaluator
+
+        with self._lock:
+            evaluator = self._evaluators.get(model_file)
+            if evaluator is None:
+                evaluator = self._load_compiled(model_file) if self.use_compiled else None
+                if evaluator is None:
+                    evaluator = self.get(model_file)
+                if evaluator is not None:
+                    self._evaluators[model_file] = evaluator
+        return evaluator
+
+    def preload(self, model_files, evaluators=False):
+        """Load a collection of model files (or their evaluators) up front"""
+        for model_file in model_files:
+            try:
+                self.get_evaluator(model_file) if evaluators else self.get(model_file)
+            except Exception as e:
+                print(f"✗ Error loading {model_file}: {e}")
+                inc('model_load_failures', file=model_file)
+
+    def _load(self, model_file):
+        """Unpickle a model file and record its load time and memory footprint"""
+        model_path = self.models_dir / model_file
+        if not model_path.exists():
+            return None
+
+        start = time.perf_counter()
+        model = joblib.load(model_path, mmap_mode=self.mmap_mode)
+        load_time = time.perf_counter() - start
+        observe('model_load', load_time, file=model_file, kind='estimator', status='ok')
+        memory_bytes = estimate_nbytes(model)
+
+        self._models[model_file] = model
+        self._stats[model_file] = {
+            'file_path': str(model_path),
+            'file_size': model_path.stat().st_size,
+            'load_time': load_time,
+            'memory_bytes': memory_bytes
+        }
+        print(f"✓ Loaded {model_file} in {load_time * 1000:.0f} ms ({memory_bytes / 1e6:.1f} MB)")
+        return model
+
+    def _load_compiled(self, model_file):
+        """Load the compiled evaluator of a model file, or None if absent or stale"""
+        from compiled_models import compiled_name, load_compiled
+
+        compiled_file = compiled_name(model_file)
+        compiled_path = self.models_dir / compiled_file
+        model_path = self.models_dir / model_file
+        if not compiled_path.exists():
+            return None
+        if model_path.exists() and compiled_path.stat().st_mtime_ns < model_path.stat().st_mtime_ns:
+            print(f"✗ Ignoring stale {compiled_file}")
+            return None
+
+        start = time.perf_counter()
+        evaluator = load_compiled(compiled_path, mmap_mode=self.mmap_mode)
+        load_time = time.perf_counter() - start
+        observe('model_load', load_time, file=compiled_file, kind='compiled', status='ok')
+        memory_bytes = estimate_nbytes(evaluator.arrays)
+
+        self._models[compiled_file] = evaluator
+        self._stats[compiled_file] = {
+            'file_path': str(compiled_path),
+            'file_size': compiled_path.stat().st_size,
+            'load_time': load_time,
+            'memory_bytes': memory_bytes,
+            'compiled': True
+        }
+        print(f"✓ Loaded {compiled_file} in {load_time * 1000:.0f} ms ({memory_bytes / 1e6:.1f} MB)")
+        return evaluator
+
+    def stats_for(self, model_file):
+        """Stats of whatever scores a model file, preferring its compiled evaluator"""
+        from compiled_models import compiled_name
+        return self._stats.get(compiled_name(model_file)) if self.is_loaded(compiled_name(model_file)) else self._stats.get(model_file)
+
+    def is_loaded(self, model_file):
+        return model_file in self._models
+
+    def stats(self):
+        """Per-model load time and memory for every resident estimator"""
+        return {model_file: dict(stats) for model_file, stats in self._stats.items()}
+
+    def memory_report(self):
+        """Private heap bytes versus memory-mapped (page-cache shareable) bytes per model
+
+        heap_bytes counts arrays held in ordinary process memory; for sklearn
+        forests this includes the tree node arrays, which are copied out of the
+        mapping when unpickled and so are never shared. mapped_rss_bytes is how
+        much of the artifact file is resident through mappings, and
+        shared_bytes is the part of that also mapped by other processes.
+        Mapping figures come from /proc/self/smaps and are None elsewhere.
+        """
+        mappings = _read_smaps()
+        report = {}
+
+        for model_file, model in list(self._models.items()):
+            path = str((self.models_dir / model_file).resolve())
+            mapped = mappings.get(path) if mappings is not None else None
+            report[model_file] = {
+                'heap_bytes': estimate_nbytes(model, include_mapped=False),
+                'mapped_rss_bytes': mapped['rss'] if mapped else (0 if mappings is not None else None),
+                'shared_bytes': mapped['shared'] if mapped else (0 if mappings is not None else None),
+                'private_mapped_bytes': mapped['private'] if mapped else (0 if mappings is not None else None)
+            }
+
+        return report
+
+    def evict(self, model_files):
+        """Forget model files and their compiled forms so the next use reloads them from disk"""
+        from compiled_models import compiled_name
+
+        with self._lock:
+            for model_file in model_files:
+                self._evaluators.pop(model_file, None)
+                for name in (model_file, compiled_name(model_file)):
+                    self._models.pop(name, None)
+                    self._stats.pop(name, None)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._evaluators.clear()
+            self._stats.clear()
+
+def is_memory_mapped(array):
+    """Whether an array's data lives in a file mapping rather than the process heap"""
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+def estimate_nbytes(obj, include_mapped=True, _seen=None):
+    """Approximate resident size of an estimator from the arrays it holds"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        if not include_mapped and is_memory_mapped(obj):
+            return 0
+        return obj.nbytes
+    if type(obj).__name__ == 'Tree':
+        # sklearn trees keep their node arrays in C buffers outside __dict__
+        state = obj.__getstate__()
+        return state['nodes'].nbytes + state['values'].nbytes
+    if isinstance(obj, dict):
+        return sum(estimate_nbytes(value, include_mapped, _seen) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_nbytes(item, include_mapped, _seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        return estimate_nbytes(vars(obj), include_mapped, _seen)
+    return 0
+
+def _read_smaps():
+    """Sum Rss / Shared / Private kB per mapped file from /proc/self/smaps (Linux only)"""
+    try:
+        with open("/proc/self/smaps") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    totals = {}
+    current = None
+    for line in lines:
+        fields = line.split()
+        if not fields:
+            continue
+        if not fields[0].endswith(':'):
+            # Mapping header: address perms offset dev inode [path]
+            current = totals.setdefault(fields[5], {'rss': 0, 'shared': 0, 'private': 0}) if len(fields) >= 6 else None
+        elif current is not None:
+            key = fields[0]
+            if key == 'Rss:':
+                current['rss'] += int(fields[1]) * 1024
+            elif key in ('Shared_Clean:', 'Shared_Dirty:'):
+                current['shared'] += int(fields[1]) * 1024
+            elif key in ('Private_Clean:', 'Private_Dirty:'):
+                current['private'] += int(fields[1]) * 1024
+    return totals
+
+def export_model_store(models_dir=None):
+    """Rewrite every artifact as an uncompressed joblib file so it can be memory-mapped
+
+    Compressed joblib files silently load without mmap. Each file is written
+    to a temporary path and swapped in atomically, so running processes keep
+    their existing mappings. Compiled artifacts are already uncompressed and
+    are skipped; one that was current for its estimator is re-stamped after
+    the estimator is rewritten, so it is not mistaken for a stale one.
+    """
+    from compiled_models import compiled_name
+
+    models_dir = Path(models_dir) if models_dir is not None else DEFAULT_MODELS_DIR
+
+    for model_path in sorted(models_dir.glob("*.joblib")):
+        if model_path.name.endswith(".compiled.joblib"):
+            continue
+        compiled_path = models_dir / compiled_name(model_path.name)
+        compiled_current = compiled_path.exists() and compiled_path.stat().st_mtime_ns >= model_path.stat().st_mtime_ns
+
+        model = joblib.load(model_path)
+        tmp_path = model_path.with_name(model_path.name + ".tmp")
+        joblib.dump(model, tmp_path, compress=0)
+        os.replace(tmp_path, model_path)
+        if compiled_current:
+            os.utime(compiled_path)
+        print(f"✓ Exported {model_path.name}")
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+def get_registry(models_dir=None):
+    """Return the process-wide registry for a models directory"""
+    from config import MODEL_MMAP_MODE, USE_COMPILED_MODELS, COMPILED_MAX_ROWS
+    models_dir = Path(models_dir) if models_dir is not None else DEFAULT_MODELS_DIR
+    key = str(models_dir.resolve())
+
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = ModelRegistry(models_dir, mmap_mode=MODEL_MMAP_MODE, use_compiled=USE_COMPILED_MODELS,
+                                             compiled_max_rows=COMPILED_MAX_ROWS)
+        return _registries[key]
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Model store maintenance")
+    parser.add_argument("command", choices=["export", "report"])
+    parser.add_argument("--models-dir", default=None)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_model_store(args.models_dir)
+    else:
+        registry = get_registry(args.models_dir)
+        registry.preload(sorted(p.name for p in registry.models_dir.glob("*_model.joblib")))
+        print(json.dumps(registry.memory_report(), indent=2))
@@ -0,0 +1,82 @@
+"""
+Nearest real respondents to a persona in each model's training data
+
+Each dataset's feature table is scaled by its per-feature standard deviation
+and indexed once with a ball tree (robust in WASH's 73 dimensions), then kept
+resident for the life of the process. Every column of the table that is not a
+model feature is an observed outcome of the respondent, so a persona's
+neighbours show what similar real people actually did.
+
+    index = get_index('oliver')
+    index.similar(parameters['oliver'], k=5)     # one persona, as a table
+    index.observed_outcomes(X, k=5)             # bulk, one row per input row
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from feature_layout import get_layout
+
+class NeighborIndex:
+    def __init__(self, model_name, table=None):
+        from sklearn.neighbors import BallTree
+
+        self.model_name = model_name
+        self.layout = get_layout(model_name)
+        if table is None:
+            table = load_table(model_name)
+
+        X = self.layout.from_frame(table)
+        # Constant features (e.g. all-zero columns) keep a unit scale
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        self.scale = scale
+        self.tree = BallTree(X / scale)
+
+        self.rows = table.index.to_numpy()
+        self.outcomes = table[[column for column in table.columns if column not in self.layout.index]].reset_index(drop=True)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def query(self, input_data, k=5):
+        """(distances, positions) of the k nearest respondents of every input row, nearest first"""
+        X = self.layout.coerce(input_data)
+        k = min(k, len(self))
+        return self.tree.query(X / self.scale, k=k)
+
+    def similar(self, parameters, k=5):
+        """The k respondents nearest to one persona, with their distance and observed outcomes"""
+        distances, positions = self.query(parameters, k)
+        neighbors = self.outcomes.iloc[positions[0]].reset_index(drop=True)
+        neighbors.insert(0, 'distance', distances[0])
+        neighbors.insert(0, 'respondent', self.rows[positions[0]])
+        return neighbors
+
+    def observed_outcomes(self, input_data, k=5):
+        """Per input row: distance to the nearest respondent and each outcome averaged over the k nearest"""
+        distances, positions = self.query(input_data, k)
+        columns = {'nearest_distance': distances[:, 0]}
+        for outcome in self.outcomes.columns:
+            values = self.outcomes[outcome].to_numpy(dtype=np.float64, na_value=np.nan)
+            columns[f"observed_{outcome}"] = np.nanmean(values[positions], axis=1)
+        return pd.DataFrame(columns)
+
+def load_table(model_name):
+    """A dataset's feature table, with its rows numbered as in the file"""
+    from config import FEATURES_DIR, MODEL_CONFIGS
+    from feature_store import read_table
+
+    return read_table(FEATURES_DIR / MODEL_CONFIGS[model_name]['features_file'])
+
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+def get_index(model_name):
+    """Process-wide index of one dataset, built on first use"""
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(model_name)
+        if index is None:
+            index = _INDEXES[model_name] = NeighborIndex(model_name)
+        return index
@@ -0,0 +1,82 @@
+"""
+JSON schema for LLM parameter extraction, generated from MODEL_CONFIGS feature ranges
+"""
+
+from config import FEATURE_RANGES
+
+def build_schema(stage_parameters):
+    """JSON schema requiring every listed feature of every model with its type and range"""
+    properties = {}
+
+    for model_name, features in stage_parameters.items():
+        feature_properties = {}
+        for feature in features:
+            kind, minimum, maximum = FEATURE_RANGES[feature]
+            feature_properties[feature] = {'type': kind, 'minimum': minimum, 'maximum': maximum}
+
+        properties[model_name] = {
+            'type': 'object',
+            'properties': feature_properties,
+            'required': list(features),
+            'additionalProperties': False
+        }
+
+    return {
+        'type': 'object',
+        'properties': properties,
+        'required': list(stage_parameters),
+        'additionalProperties': False
+    }
+
+def build_response_format(name, stage_parameters, strict=True):
+    """OpenAI response_format: a strict JSON schema, or plain JSON mode for older models"""
+    if not strict:
+        return {'type': 'json_object'}
+
+    return {
+        'type': 'json_schema',
+        'json_schema': {
+            'name': name,
+            'strict': True,
+            'schema': build_schema(stage_parameters)
+        }
+    }
+
+def default_feature_value(feature):
+    """Value used for a feature nothing else supplied, by feature type"""
+    if 'issues_none' in feature or 'email_account_personal' in feature:
+        return 1
+    if any(x in feature for x in ['category', 'level', 'recency']):
+        return 3
+    return 0
+
+def validate_parameters(parsed, stage_parameters):
+    """Validate a parsed response against the schema in one pass
+
+    Keeps only known features, coerces integer features, and clamps values to
+    their range. Missing or non-numeric values are dropped so _expand_parameters
+    fills its defaults. Returns None if the response holds no valid stage
+    feature at all (e.g. {"wash": {}}), so it is neither cached nor counted as
+    a usable answer.
+    """
+    if not isinstance(parsed, dict):
+        return None
+
+    validated = {}
+    for model_name, features in stage_parameters.items():
+        model_values = parsed.get(model_name)
+        if not isinstance(model_values, dict):
+            continue
+
+        validated[model_name] = {}
+        for feature in features:
+            value = model_values.get(feature)
+            # bool is an int subclass; JSON true/false still count as 1/0
+            if not isinstance(value, (int, float)) or value != value:
+                continue
+
+            kind, minimum, maximum = FEATURE_RANGES[feature]
+            value = min(max(value, minimum), maximum)
+            validated[model_name][feature] = int(round(value)) if kind == 'integer' else float(value)
+
+    return validated if any(validated.values()) else None
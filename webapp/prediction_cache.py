@@ -0,0 +1,100 @@
+"""
+Bounded in-memory LRU of prediction results keyed on canonical feature vectors
+
+Different persona texts often expand to the same feature vector, since most
+fields are small integers or coarse standardized values, so identical
+scenarios can skip inference entirely.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+def feature_key(row):
+    """Digest of one ordered feature vector as float64; -0.0 and 0.0 hash alike"""
+    row = np.ascontiguousarray(row, dtype=np.float64) + 0.0
+    return hashlib.blake2b(row.tobytes(), digest_size=16).digest()
+
+class PredictionCache:
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model_name, key):
+        """Cached per-target result of one row, or None"""
+        with self._lock:
+            value = self._entries.get((model_name, key))
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((model_name, key))
+            self.hits += 1
+            return value
+
+    def put(self, model_name, key, value):
+        with self._lock:
+            self._entries[(model_name, key)] = value
+            self._entries.move_to_end((model_name, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, model_name=None):
+        """Drop every entry of one model, or of all models"""
+        with self._lock:
+            if model_name is None:
+                self._entries.clear()
+            else:
+                for entry in [entry for entry in self._entries if entry[0] == model_name]:
+                    del self._entries[entry]
+            self.invalidations += 1
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'max_entries': self.max_entries
+        }
+
+def split_rows(columns, n_rows):
+    """Split columnar predictions into per-row entries of length-1 column copies
+
+    Copies rather than views, so a cached row does not keep the whole batch's arrays alive.
+    """
+    return [
+        {
+            target: {name: values[i:i + 1].copy() if values is not None else None for name, values in target_columns.items()}
+            for target, target_columns in columns.items()
+        }
+        for i in range(n_rows)
+    ]
+
+def join_rows(rows):
+    """Concatenate per-row entries back into columnar predictions
+
+    Only targets present in every row are kept, as a failed target is left out.
+    """
+    columns = {}
+    for target, first in rows[0].items():
+        if not all(target in row for row in rows):
+            continue
+        columns[target] = {
+            name: np.concatenate([row[target][name] for row in rows]) if values is not None else None
+            for name, values in first.items()
+        }
+    return columns
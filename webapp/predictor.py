@@ -2,14 +2,20 @@
 Model predictor for making predictions with all loaded models
 """
 
+import threading
+import time
 import joblib
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from config import MODEL_CONFIGS
+from config import MODEL_CONFIGS, INFERENCE_WORKERS, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_CHECK_SECONDS, PREDICTION_CACHE_MAX_ROWS
+from compiled_models import compiled_name
+from metrics import span, inc, observe
+from model_registry import get_registry
+from prediction_cache import PredictionCache, feature_key, split_rows, join_rows
 from predictors import WashPredictor, OliverPredictor, LorinPredictor
 
 class ModelPredictor:
-    def __init__(self, models_path=None):
+    def __init__(self, models_path=None, inference_workers=None, background=False):
         # Auto-detect models path - check both relative and absolute
         if models_path is None:
             current_dir = Path(__file__).parent  # webapp directory
@@ -30,56 +36,235 @@ class ModelPredictor:
             self.models_path = Path(models_path)
             
         print(f"Using models path: {self.models_path.absolute()}")
+        self.registry = get_registry(self.models_path)
         self.models = {}
-        self._load_models()
+        self.last_timings = {}
+        
+        # Results of already seen feature vectors, dropped when a model's artifacts change
+        self.prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE)
+        self._fingerprints = {}
+        self._checked_at = {}
+        
+        # Shared pool that runs target estimators concurrently; 1 or less scores sequentially
+        workers = INFERENCE_WORKERS if inference_workers is None else inference_workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference") if workers > 1 else None
+        
+        # With background=True models load on a daemon thread; predictions wait for it
+        self._attempted = set()
+        self._loaded = threading.Event()
+        self.load_time = None
+        if background:
+            threading.Thread(target=self._load_models, name="model-warmup", daemon=True).start()
+        else:
+            self._load_models()
     
     def _load_models(self):
         """Load all available models"""
-        for model_name, config in MODEL_CONFIGS.items():
-            try:
-                predictor_path = self.models_path / config['predictor_file']
-                
-                print(f"Checking for {model_name} at: {predictor_path}")
+        start = time.perf_counter()
+        try:
+            for model_name in MODEL_CONFIGS:
+                self._load_model(model_name)
+                self._attempted.add(model_name)
+        finally:
+            self.load_time = time.perf_counter() - start
+            observe('model_warmup', self.load_time, status='ok' if self.models else 'error')
+            self._loaded.set()
+    
+    def is_loading(self):
+        """Whether a background load is still running"""
+        return not self._loaded.is_set()
+    
+    def wait_until_loaded(self, timeout=None):
+        """Block until every model has been tried; False if the timeout expired first"""
+        return self._loaded.wait(timeout)
+    
+    def _load_model(self, model_name):
+        """Load one model's predictor and keep its target evaluators resident"""
+        config = MODEL_CONFIGS[model_name]
+        try:
+            predictor_path = self.models_path / config['predictor_file']
+            
+            print(f"Checking for {model_name} at: {predictor_path}")
+            
+            if predictor_path.exists():
+                predictor = joblib.load(predictor_path)
+                # Keep every target estimator resident instead of reloading per call
+                predictor.attach_registry(self.registry)
+                predictor.load_models()
+                self.models[model_name] = predictor
+                self._fingerprints[model_name] = self._artifact_fingerprint(model_name)
+                self._checked_at[model_name] = time.monotonic()
+                print(f"✓ Loaded {model_name} model")
+            else:
+                print(f"✗ Model file not found: {predictor_path}")
                 
-                if predictor_path.exists():
-                    predictor = joblib.load(predictor_path)
-                    self.models[model_name] = predictor
-                    print(f"✓ Loaded {model_name} model")
-                else:
-                    print(f"✗ Model file not found: {predictor_path}")
-                    
-            except Exception as e:
-                print(f"✗ Error loading {model_name}: {e}")
+        except Exception as e:
+            print(f"✗ Error loading {model_name}: {e}")
+            inc('model_load_failures', model=model_name)
+    
+    def _artifact_fingerprint(self, model_name):
+        """(name, mtime, size) of a model's predictor, estimator and compiled files"""
+        files = [MODEL_CONFIGS[model_name]['predictor_file']]
+        for model_file in self.models[model_name].model_files.values():
+            files += [model_file, compiled_name(model_file)]
+        
+        fingerprint = []
+        for name in files:
+            try:
+                stat = (self.models_path / name).stat()
+                fingerprint.append((name, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                fingerprint.append((name, None, None))
+        return tuple(fingerprint)
+    
+    def _refresh_if_changed(self, model_name):
+        """Reload a model and drop its cached predictions when any of its artifacts changed"""
+        now = time.monotonic()
+        if now - self._checked_at.get(model_name, 0.0) < PREDICTION_CACHE_CHECK_SECONDS:
+            return
+        self._checked_at[model_name] = now
+        
+        if self._artifact_fingerprint(model_name) == self._fingerprints.get(model_name):
+            return
+        
+        print(f"Model artifacts changed for {model_name}, reloading")
+        self.prediction_cache.invalidate(model_name)
+        self.registry.evict(self.models[model_name].model_files.values())
+        self._load_model(model_name)
     
     def predict_all(self, parameters):
         """Make predictions with all loaded models"""
-        results = {}
+        self.wait_until_loaded()
+        matrices = {}
         
-        for model_name, model in self.models.items():
+        for model_name in self.models:
             if model_name in parameters:
-                try:
-                    model_params = parameters[model_name]
-                    config = MODEL_CONFIGS[model_name]
-                    input_data = {}
-                    
-                    for feature in config['features']:
-                        input_data[feature] = model_params.get(feature, 0)
-                    
-                    df = pd.DataFrame([input_data])
-                    prediction = model(df)
-                    
-                    results[model_name] = prediction
-                    print(f"✓ Prediction successful for {model_name}")
-                    
-                except Exception as e:
-                    print(f"✗ Prediction failed for {model_name}: {e}")
-                    results[model_name] = None
+                # Laid out by prepare_input, so a bad model dict only fails that model
+                matrices[model_name] = parameters[model_name]
             else:
                 print(f"✗ No parameters provided for {model_name}")
+        
+        with span('predict_all'):
+            results = self._score_matrices(matrices)
+        
+        return {
+            model_name: self.models[model_name].first_row(results[model_name]) if results.get(model_name) is not None else None
+            for model_name in self.models
+        }
+
+    def predict_batch(self, personas, use_cache=None):
+        """Score many personas at once with a single estimator call per target
+
+        personas is either a list of parameter dicts as returned by
+        LLMProcessor.extract_parameters, or a dict mapping model name to a
+        feature matrix (DataFrame, array in MODEL_CONFIGS feature order, or
+        list of {feature: value} dicts).
+        Returns {model_name: {target: {'prediction': array, 'probability': array}}}.
+        By default only batches of up to PREDICTION_CACHE_MAX_ROWS rows go
+        through the prediction cache; pass use_cache=True or False to force it.
+        """
+        self.wait_until_loaded()
+        if isinstance(personas, dict):
+            matrices = personas
+        else:
+            matrices = {}
+            for model_name in self.models:
+                matrices[model_name] = [params.get(model_name, {}) for params in personas]
+
+        return self._score_matrices(matrices, use_cache)
+
+    def _score_matrices(self, matrices, use_cache=None):
+        """Score each model's matrix on every target, fanned out across the shared pool
+
+        Only models present in matrices are scored and returned. Rows whose
+        feature vector is already in the prediction cache are not scored
+        again. A model whose input cannot be prepared yields None; a failing
+        target is reported and left out, as in the predictors' own loop.
+        Per-target wall time is kept in last_timings.
+        """
+        results = {}
+        prepared = {}
+        lookups = {}
+        
+        for model_name in list(self.models):
+            # Callers such as the sensitivity sweeps only pass the models they need
+            if model_name not in matrices:
+                continue
+            try:
+                self._refresh_if_changed(model_name)
+                X = self.models[model_name].prepare_input(matrices[model_name])
+                results[model_name] = {}
+            except Exception as e:
+                print(f"✗ Prediction failed for {model_name}: {e}")
                 results[model_name] = None
+                continue
+            
+            cached = use_cache if use_cache is not None else len(X) <= PREDICTION_CACHE_MAX_ROWS
+            if not cached:
+                prepared[model_name] = X
+                continue
+            
+            keys = [feature_key(row) for row in X]
+            rows = [self.prediction_cache.get(model_name, key) for key in keys]
+            misses = [i for i, row in enumerate(rows) if row is None]
+            lookups[model_name] = (keys, rows, misses)
+            inc('prediction_cache_hits', len(rows) - len(misses), model=model_name)
+            inc('prediction_cache_misses', len(misses), model=model_name)
+            if misses:
+                prepared[model_name] = X if len(misses) == len(X) else X[misses]
+        
+        jobs = [(model_name, target) for model_name in prepared for target in self.models[model_name].model_files]
+        
+        def run(job):
+            model_name, target = job
+            start = time.perf_counter()
+            with span('target_inference', model=model_name, target=target):
+                columns = self.models[model_name].score_target(target, prepared[model_name])
+            return columns, time.perf_counter() - start
         
+        if self.executor is not None:
+            futures = [self.executor.submit(run, job) for job in jobs]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    outcomes.append(e)
+        else:
+            outcomes = []
+            for job in jobs:
+                try:
+                    outcomes.append(run(job))
+                except Exception as e:
+                    outcomes.append(e)
+        
+        timings = {model_name: {} for model_name in prepared}
+        failed = set()
+        for (model_name, target), outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Error predicting {model_name}/{target}: {outcome}")
+                inc('target_failures', model=model_name, target=target)
+                failed.add(model_name)
+                continue
+            columns, elapsed = outcome
+            timings[model_name][target] = elapsed
+            if columns is not None:
+                results[model_name][target] = columns
+        
+        for model_name, (keys, rows, misses) in lookups.items():
+            if misses:
+                scored = split_rows(results[model_name], len(misses))
+                for i, row in zip(misses, scored):
+                    rows[i] = row
+                    # Partial results would hide a target that fails only transiently
+                    if model_name not in failed:
+                        self.prediction_cache.put(model_name, keys[i], row)
+            if len(misses) < len(rows):
+                results[model_name] = join_rows(rows)
+        
+        self.last_timings = timings
         return results
-    
+
     def get_model_status(self):
         """Get status of loaded models"""
         status = {}
@@ -88,8 +273,18 @@ class ModelPredictor:
             model_file = self.models_path / MODEL_CONFIGS[model_name]['predictor_file']
             status[model_name] = {
                 'loaded': model_name in self.models,
+                'loading': model_name not in self._attempted,
                 'file_path': str(model_file),
-                'file_exists': model_file.exists()
+                'file_exists': model_file.exists(),
+                'targets': self.models[model_name].get_model_stats() if model_name in self.models else {}
             }
         
-        return status
\ No newline at end of file
+        return status
+    
+    def get_cache_stats(self):
+        """Hit rate and size of the prediction cache"""
+        return self.prediction_cache.stats()
+    
+    def get_memory_report(self):
+        """Resident heap versus memory-mapped bytes per model artifact (forest trees are always heap)"""
+        return self.registry.memory_report()
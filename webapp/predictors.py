@@ -2,12 +2,143 @@
 Predictor classes for all models
 """
 
-import joblib
-from pathlib import Path
+import numpy as np
 import pandas as pd
+from feature_layout import FeatureLayout
+from metrics import inc
+from model_registry import get_registry
 
-class WashPredictor:
-    def __init__(self):
+def score_classifier(model, input_data):
+    """Evaluate a classifier once and derive labels from its probability matrix
+
+    Equivalent to calling predict and predict_proba, which would walk every
+    tree of a forest twice. Returns (labels, probabilities).
+    """
+    if hasattr(model, 'predict_proba') and hasattr(model, 'classes_'):
+        prob_array = model.predict_proba(input_data)
+        # Same argmax rule forests use inside predict
+        labels = model.classes_.take(np.argmax(prob_array, axis=1), axis=0)
+        return labels, prob_array
+    
+    return model.predict(input_data), None
+
+class BasePredictor:
+    """Shared scoring loop; subclasses define model_files and features"""
+
+    # MODEL_CONFIGS key, used to label metrics
+    model_name = None
+
+    # Targets that also report the positive-class probability
+    classification_targets = ()
+
+    def __init__(self, models_dir=None):
+        self.models_dir = models_dir
+        self._init_runtime()
+
+    def _init_runtime(self):
+        self.registry = get_registry(getattr(self, 'models_dir', None))
+        self.layout = FeatureLayout(self.features)
+
+    def __getstate__(self):
+        # Estimators live in the registry, not in the pickled predictor
+        state = self.__dict__.copy()
+        state.pop('registry', None)
+        state.pop('layout', None)
+        return state
+
+    def __setstate__(self, state):
+        # Pickled predictors skip __init__, so rebuild runtime state here
+        self.__dict__.update(state)
+        self._init_runtime()
+
+    def attach_registry(self, registry):
+        """Share a registry, e.g. the one owned by ModelPredictor"""
+        self.registry = registry
+
+    def load_models(self):
+        """Deserialize every target evaluator once and keep it resident"""
+        self.registry.preload(self.model_files.values(), evaluators=True)
+
+    def get_model_stats(self):
+        """Load time and memory of each resident target evaluator"""
+        return {
+            target: self.registry.stats_for(model_file)
+            for target, model_file in self.model_files.items()
+        }
+
+    def prepare_input(self, input_data):
+        """Coerce a dict, list of dicts, DataFrame or array into the float64 feature matrix
+
+        Bare matrices are expected in self.features column order.
+        """
+        return self.layout.coerce(input_data)
+
+    def score_target(self, target, input_data):
+        """Columnar predictions of one target for prepared input, or None if its model is missing"""
+        model = self.registry.get_evaluator(self.model_files[target], rows=len(input_data))
+        if model is None:
+            return None
+        
+        # Compiled evaluators take the array as is; sklearn estimators fitted on
+        # named columns check the names, so only they get a frame
+        if getattr(model, 'feature_names_in_', None) is not None:
+            input_data = pd.DataFrame(input_data, columns=self.features)
+        
+        if target in self.classification_targets:
+            pred, prob_array = score_classifier(model, input_data)
+            prob = None
+            if prob_array is not None and prob_array.shape[1] > 1:
+                prob = prob_array[:, 1].astype(float)
+            
+            return {
+                'prediction': pred.astype(int),
+                'probability': prob
+            }
+        
+        pred = model.predict(input_data)
+        return {'prediction': pred.astype(float)}
+
+    def predict_batch(self, input_data):
+        """Score every row with one predict/predict_proba call per target estimator"""
+        input_data = self.prepare_input(input_data)
+        
+        predictions = {}
+        
+        for target in self.model_files:
+            try:
+                columns = self.score_target(target, input_data)
+                if columns is not None:
+                    predictions[target] = columns
+                        
+            except Exception as e:
+                print(f"Error predicting {target}: {e}")
+                inc('target_failures', model=self.model_name, target=target)
+        
+        return predictions
+
+    @staticmethod
+    def first_row(batch):
+        """Convert columnar predictions into the single-row result format"""
+        predictions = {}
+        for target, columns in batch.items():
+            predictions[target] = {'prediction': columns['prediction'][0].item()}
+            if 'probability' in columns:
+                prob = columns['probability']
+                predictions[target]['probability'] = float(prob[0]) if prob is not None else None
+        
+        return predictions
+
+    def __call__(self, input_data):
+        return self.first_row(self.predict_batch(input_data))
+
+class WashPredictor(BasePredictor):
+    model_name = 'wash'
+    classification_targets = (
+        'final_decision', 'actions_taken_clicked', 'actions_taken_reported',
+        'actions_taken_deleted', 'actions_taken_ignored'
+    )
+
+    def __init__(self, models_dir=None):
         self.model_files = {
             'final_decision': 'wash_final_decision_model.joblib',
             'actions_taken_clicked': 'wash_actions_taken_clicked_model.joblib',
@@ -47,49 +178,13 @@ class WashPredictor:
             'email_body_issues_strange', 'email_body_issues_more_info', 'email_body_issues_less_info',
             'suspicion_confidence', 'overall_suspicion', 'perceived_harm'
         ]
-    
-    def __call__(self, input_data):
-        if isinstance(input_data, dict):
-            input_data = pd.DataFrame([input_data])
-        
-        for f in self.features:
-            if f not in input_data.columns:
-                input_data[f] = 0
         
-        input_data = input_data[self.features].fillna(0)
-        
-        predictions = {}
-        models_dir = Path(__file__).parent.parent / "models"
-        
-        for target, model_file in self.model_files.items():
-            try:
-                model_path = models_dir / model_file
-                if model_path.exists():
-                    model = joblib.load(model_path)
-                    pred = model.predict(input_data)
-                    
-                    if target in ['final_decision', 'actions_taken_clicked', 'actions_taken_reported', 
-                                 'actions_taken_deleted', 'actions_taken_ignored']:
-                        prob = None
-                        if hasattr(model, 'predict_proba'):
-                            prob_array = model.predict_proba(input_data)
-                            if prob_array.shape[1] > 1:
-                                prob = prob_array[0][1]
-                        
-                        predictions[target] = {
-                            'prediction': int(pred[0]), 
-                            'probability': float(prob) if prob is not None else None
-                        }
-                    else:
-                        predictions[target] = {'prediction': float(pred[0])}
-                        
-            except Exception as e:
-                print(f"Error loading {target}: {e}")
-        
-        return predictions
+        super().__init__(models_dir)
+
+class OliverPredictor(BasePredictor):
+    model_name = 'oliver'
 
-class OliverPredictor:
-    def __init__(self):
+    def __init__(self, models_dir=None):
         self.model_files = {
             'phishing_test_percent_correct': 'oliver_phishing_test_percent_correct_model.joblib',
             'knowledge_test_percent_correct': 'oliver_knowledge_test_percent_correct_model.joblib'
@@ -101,35 +196,13 @@ class OliverPredictor:
             'perceived_knowledge', 'perceived_self_efficacy', 'perceived_severity', 
             'perceived_vulnerability', 'email_trust'
         ]
-    
-    def __call__(self, input_data):
-        if isinstance(input_data, dict):
-            input_data = pd.DataFrame([input_data])
-        
-        for f in self.features:
-            if f not in input_data.columns:
-                input_data[f] = 0
-        
-        input_data = input_data[self.features].fillna(0)
         
-        predictions = {}
-        models_dir = Path(__file__).parent.parent / "models"
-        
-        for target, model_file in self.model_files.items():
-            try:
-                model_path = models_dir / model_file
-                if model_path.exists():
-                    model = joblib.load(model_path)
-                    pred = model.predict(input_data)
-                    predictions[target] = {'prediction': float(pred[0])}
-                    
-            except Exception as e:
-                print(f"Error loading {target}: {e}")
-        
-        return predictions
+        super().__init__(models_dir)
 
-class LorinPredictor:
-    def __init__(self):
+class LorinPredictor(BasePredictor):
+    model_name = 'lorin'
+
+    def __init__(self, models_dir=None):
         self.model_files = {
             'class_phish_accuracy': 'lorin_class_phish_accuracy_model.joblib',
             'class_nophish_accuracy': 'lorin_class_nophish_accuracy_model.joblib'
@@ -143,29 +216,5 @@ class LorinPredictor:
             'pre_security_concern', 'pre_security_attitude_total',
             'knowledge_total', 'proficiency'
         ]
-    
-    def __call__(self, input_data):
-        if isinstance(input_data, dict):
-            input_data = pd.DataFrame([input_data])
-        
-        for f in self.features:
-            if f not in input_data.columns:
-                input_data[f] = 0
-        
-        input_data = input_data[self.features].fillna(0)
-        
-        predictions = {}
-        models_dir = Path(__file__).parent.parent / "models"
-        
-        for target, model_file in self.model_files.items():
-            try:
-                model_path = models_dir / model_file
-                if model_path.exists():
-                    model = joblib.load(model_path)
-                    pred = model.predict(input_data)
-                    predictions[target] = {'prediction': float(pred[0])}
-                    
-            except Exception as e:
-                print(f"Error loading {target}: {e}")
         
-        return predictions
\ No newline at end of file
+        super().__init__(models_dir)
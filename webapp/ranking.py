@@ -0,0 +1,138 @@
+"""
+Rank a catalogue of candidate interventions for one persona
+
+The persona's parameters are held fixed and broadcast to every candidate,
+only the INTERVENTION_PARAMETERS fields vary, and all candidates go through
+ModelPredictor.predict_batch as one matrix per model.
+
+Usage:
+    python ranking.py persona.json catalogue.csv --objective wash/final_decision --top-k 10
+"""
+
+import numpy as np
+from config import MODEL_CONFIGS, INTERVENTION_PARAMETERS
+from sensitivity import base_vector, response_curve
+
+def intervention_values(intervention, model_name):
+    """One candidate's intervention fields for a model
+
+    A candidate is either {model_name: {feature: value}}, as returned by
+    LLMProcessor.extract_intervention, or a flat {feature: value} dict;
+    intervention feature names are unique across models.
+    """
+    nested = intervention.get(model_name)
+    if isinstance(nested, dict):
+        return nested
+    return intervention
+
+def build_candidate_matrix(persona_parameters, interventions, model_name):
+    """Persona row repeated per candidate with each candidate's intervention fields written in"""
+    feature_names = MODEL_CONFIGS[model_name]['features']
+    matrix = np.tile(base_vector(persona_parameters, model_name), (len(interventions), 1))
+
+    for feature in INTERVENTION_PARAMETERS.get(model_name, []):
+        column = feature_names.index(feature)
+        for row, intervention in enumerate(interventions):
+            value = intervention_values(intervention, model_name).get(feature)
+            if value is not None:
+                matrix[row, column] = value
+
+    return matrix
+
+def rank_interventions(model_predictor, persona_parameters, interventions, objective, top_k=10, maximize=True):
+    """Score every candidate intervention for one persona and return the top_k by objective
+
+    objective is (model_name, target); classification targets are ranked by
+    positive-class probability, regression targets by their prediction.
+    Returns a list of {'rank', 'index', 'name', 'score', 'predictions'}
+    dicts, best first, where predictions holds every target of every model
+    for that candidate in predict_all format.
+    """
+    model_name, target = objective
+    if not interventions:
+        return []
+
+    matrices = {
+        name: build_candidate_matrix(persona_parameters, interventions, name)
+        for name in model_predictor.models
+    }
+    batch = model_predictor.predict_batch(matrices, use_cache=False)
+
+    if not batch.get(model_name) or target not in batch[model_name]:
+        raise ValueError(f"No predictions for objective {model_name}/{target}")
+
+    scores = np.asarray(response_curve(batch[model_name][target]), dtype=float)
+    # Stable sort keeps catalogue order among ties
+    order = np.argsort(-scores if maximize else scores, kind='stable')[:top_k]
+
+    ranked = []
+    for rank, index in enumerate(order, start=1):
+        index = int(index)
+        ranked.append({
+            'rank': rank,
+            'index': index,
+            'name': interventions[index].get('name', f"intervention_{index}"),
+            'score': float(scores[index]),
+            'predictions': {
+                name: model_predictor.models[name].first_row(_take_row(columns, index))
+                for name, columns in batch.items() if columns is not None
+            }
+        })
+
+    return ranked
+
+def read_catalogue(path):
+    """Candidate interventions from a CSV (one column per intervention field) or JSON/JSONL file"""
+    import json
+    from pathlib import Path
+
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    if path.suffix == ".json":
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    import pandas as pd
+    catalogue = pd.read_csv(path)
+    return [
+        {key: value for key, value in row.items() if value == value}
+        for row in catalogue.to_dict("records")
+    ]
+
+def _take_row(columns, index):
+    return {
+        target: {name: values[index:index + 1] if values is not None else None for name, values in target_columns.items()}
+        for target, target_columns in columns.items()
+    }
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from predictor import ModelPredictor
+
+    parser = argparse.ArgumentParser(description="Rank candidate interventions for one persona")
+    parser.add_argument("persona", help="JSON file of persona parameters ({model: {feature: value}})")
+    parser.add_argument("catalogue", help="CSV, JSON or JSONL file of candidate interventions")
+    parser.add_argument("--objective", default="wash/final_decision", help="model/target to rank by")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--minimize", action="store_true", help="Rank lowest objective first")
+    parser.add_argument("--models-dir", default=None)
+    args = parser.parse_args()
+
+    with open(args.persona, encoding="utf-8") as f:
+        persona_parameters = json.load(f)
+
+    ranked = rank_interventions(
+        ModelPredictor(args.models_dir),
+        persona_parameters,
+        read_catalogue(args.catalogue),
+        tuple(args.objective.split("/", 1)),
+        top_k=args.top_k,
+        maximize=not args.minimize
+    )
+
+    for entry in ranked:
+        print(f"{entry['rank']:>3}. {entry['name']:<40} {entry['score']:.4f}")
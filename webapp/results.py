@@ -2,8 +2,11 @@
 Results display with separate intervention and persona parameter views
 """
 
+import pandas as pd
 import streamlit as st
-from config import MODEL_CONFIGS
+from config import MODEL_CONFIGS, INTERVENTION_PARAMETERS, PERSONA_PARAMETERS, SENSITIVITY_POINTS, NEIGHBOR_COUNT
+from metrics import METRICS
+from sensitivity import sweep_features, response_curve, rank_features
 
 def display_parameters_passed_to_models(parameters):
     """Display parameters separated by intervention vs persona triggers"""
@@ -25,83 +28,13 @@ def display_parameters_passed_to_models(parameters):
 
 def display_intervention_parameters(parameters):
     """Show parameters that should be influenced by intervention description"""
-    intervention_params = {
-        'wash': [
-            # Email issue detection patterns (what intervention teaches to recognize)
-            'sender_issues_none', 'sender_issues_name_different', 'sender_issues_email_different',
-            'subject_line_issues_none', 'subject_line_issues_different',
-            'email_body_issues_none', 'email_body_issues_typos', 'email_body_issues_missing',
-            'email_body_issues_strange', 'email_body_issues_more_info', 'email_body_issues_less_info',
-            # Typical phishing characteristics (intervention scenarios)
-            'actions_requested_click_link', 'actions_requested_open_attachment',
-            'actions_requested_respond_info', 'actions_requested_external_action'
-        ],
-        'oliver': [
-            # PMT threat perceptions (intervention context)
-            'perceived_severity', 'perceived_vulnerability'
-        ],
-        'lorin': [
-            # Training provision
-            'security_training_prior'
-        ]
-    }
+    intervention_params = INTERVENTION_PARAMETERS
     
     display_categorized_parameters(parameters, intervention_params, "intervention")
 
 def display_persona_parameters(parameters):
     """Show parameters that should be influenced by persona description"""
-    persona_params = {
-        'wash': [
-            # Demographics
-            'age_category', 'gender', 'education_level', 'employment_status', 'annual_income',
-            # IT background & history
-            'has_it_training', 'has_it_job',
-            'previous_incidents_phishing_email', 'previous_incidents_data_breach',
-            'previous_incidents_computer_virus', 'previous_incidents_device_hacked',
-            'previous_incidents_credit_card_fraud', 'previous_incidents_identity_theft',
-            'previous_incidents_any',
-            # Digital literacy (personal knowledge)
-            'digital_literacy_wiki', 'digital_literacy_meme', 'digital_literacy_phishing',
-            'digital_literacy_bookmark', 'digital_literacy_cache', 'digital_literacy_ssl',
-            'digital_literacy_ajax', 'digital_literacy_rss', 'digital_literacy_other',
-            'digital_literacy_total',
-            # Emotional responses (personality-based)
-            'emotion_dread', 'emotion_terror', 'emotion_anxiety', 'emotion_nervous',
-            'emotion_scared', 'emotion_panic', 'emotion_fear', 'emotion_worry',
-            'emotion_total',
-            # Personal behaviors and traits
-            'investigated_sender', 'investigated_links', 'investigated_external',
-            'noticed_sender_issues', 'noticed_content_issues', 'noticed_technical_issues',
-            'suspicion_confidence', 'overall_suspicion', 'perceived_harm',
-            # Email usage patterns
-            'email_recency', 'email_account_work', 'email_account_student', 'email_account_personal',
-            'email_content_work_related', 'email_content_personal',
-            'email_sender_work_colleague', 'email_sender_friend_family',
-            'email_sender_acquaintance', 'email_sender_organization',
-            'sender_relationship_duration', 'expected_this_email', 'felt_similar_before',
-            'previous_sender_emails', 'previous_sender_interaction', 'email_seemed_different'
-        ],
-        'oliver': [
-            # Demographics
-            'age_category', 'gender', 'education_level', 'employment_status',
-            # IT background
-            'it_job', 'phishing_victim', 'phishing_victim_count',
-            # Personal perceptions
-            'perceived_knowledge', 'perceived_self_efficacy', 'email_trust'
-        ],
-        'lorin': [
-            # Demographics
-            'age_category', 'education_level', 'it_experience', 'email_frequency',
-            # Big Five personality traits
-            'personality_extraversion', 'personality_agreeableness', 
-            'personality_conscientiousness', 'personality_neuroticism', 'personality_openness',
-            # Personal security attitudes
-            'pre_security_engagement', 'pre_security_attentiveness', 
-            'pre_security_resistance', 'pre_security_concern', 'pre_security_attitude_total',
-            # Personal capabilities
-            'knowledge_total', 'proficiency'
-        ]
-    }
+    persona_params = PERSONA_PARAMETERS
     
     display_categorized_parameters(parameters, persona_params, "persona")
 
@@ -304,6 +237,23 @@ def display_all_results(results):
     if 'lorin' in available_results:
         display_lorin_results(available_results['lorin'])
 
+def display_similar_respondents(parameters, k=NEIGHBOR_COUNT):
+    """The k real respondents of each dataset nearest to the persona, with their observed outcomes"""
+    from neighbors import get_index
+    
+    st.header("Similar Real Respondents")
+    st.caption("Closest study participants by scaled feature distance, with what they actually did")
+    
+    model_names = [name for name in MODEL_CONFIGS if name in parameters]
+    for tab, model_name in zip(st.tabs([name.upper() for name in model_names]), model_names):
+        with tab:
+            try:
+                neighbors = get_index(model_name).similar(parameters[model_name], k)
+            except (FileNotFoundError, ValueError) as e:
+                st.error(f"No {model_name.upper()} respondents available: {e}")
+                continue
+            st.dataframe(neighbors.round(3), hide_index=True)
+
 def display_parameter_summary(parameters, summary):
     """Display simple parameter summary"""
     st.subheader("Extraction Summary")
@@ -316,4 +266,93 @@ def display_parameter_summary(parameters, summary):
                 f"{model_name.upper()}", 
                 f"{completeness:.0f}%",
                 f"{stats['extracted']}/{stats['total']}"
-            )
\ No newline at end of file
+            )
+
+def display_sensitivity_panel(model_predictor, parameters):
+    """What-if panel: sweep each feature of the extracted parameters and chart every target"""
+    st.header("What-if Sensitivity")
+    
+    model_names = [name for name in MODEL_CONFIGS if name in model_predictor.models]
+    if not model_names:
+        st.error("No models loaded")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        model_name = st.selectbox("Model", model_names, format_func=str.upper)
+    with col2:
+        points = st.slider("Points per continuous feature", 3, 21, SENSITIVITY_POINTS, step=2)
+    
+    # Sweeping every feature at once is one batch per target and gives the ranking for free
+    curves = sweep_features(model_predictor, parameters, points=points, models=[model_name])
+    model_curves = curves.get(model_name)
+    if not model_curves:
+        st.error(f"No {model_name.upper()} predictions")
+        return
+    
+    targets = list(next(iter(model_curves.values()))['targets'])
+    target = st.selectbox("Rank features by target", targets)
+    ranking = rank_features(curves, target, model_name)
+    
+    with st.expander("Most influential features"):
+        st.dataframe(
+            pd.DataFrame(ranking[:10], columns=["Feature", "Output range"]),
+            hide_index=True
+        )
+    
+    selected = st.multiselect(
+        "Features to plot",
+        MODEL_CONFIGS[model_name]['features'],
+        default=[feature for feature, _ in ranking[:3]]
+    )
+    
+    for feature in selected:
+        curve = model_curves[feature]
+        chart = pd.DataFrame(
+            {name: response_curve(columns) for name, columns in curve['targets'].items()},
+            index=pd.Index(curve['values'], name=feature)
+        )
+        st.write(f"**{feature}** (extracted value: {curve['baseline']:g})")
+        st.line_chart(chart)
+
+def display_diagnostics_panel():
+    """Per-stage timings and counters recorded by this process"""
+    snapshot = METRICS.snapshot()
+    
+    with st.expander("Diagnostics"):
+        if not snapshot['spans'] and not snapshot['counters']:
+            st.write("No requests recorded yet")
+            return
+        
+        if snapshot['spans']:
+            st.subheader("Stage timings")
+            st.dataframe(pd.DataFrame([
+                {
+                    'Stage': span['name'],
+                    'Labels': ", ".join(f"{key}={value}" for key, value in span['labels'].items()),
+                    'Count': span['count'],
+                    'Mean (ms)': round(span['mean_ms'], 2),
+                    'p50 (ms)': round(span['p50_ms'], 2),
+                    'p95 (ms)': round(span['p95_ms'], 2),
+                    'p99 (ms)': round(span['p99_ms'], 2)
+                }
+                for span in snapshot['spans']
+            ]), hide_index=True)
+        
+        if snapshot['counters']:
+            st.subheader("Counters")
+            st.dataframe(pd.DataFrame([
+                {
+                    'Counter': counter['name'],
+                    'Labels': ", ".join(f"{key}={value}" for key, value in counter['labels'].items()),
+                    'Value': counter['value']
+                }
+                for counter in snapshot['counters']
+            ]), hide_index=True)
+        
+        st.download_button(
+            "Download Prometheus metrics",
+            METRICS.export_prometheus(),
+            file_name="cypersona_metrics.prom",
+            mime="text/plain"
+        )
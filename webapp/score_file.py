@@ -0,0 +1,193 @@
+"""
+Streaming scorer for large feature files
+
+Reads a CSV or Parquet file laid out like data/features/*_ml_optimized.csv
+in fixed-size chunks, scores each chunk with one predict_batch call per
+target, and appends the predictions to the output file before reading the
+next chunk, so memory stays flat however large the input is.
+
+Usage:
+    python score_file.py population.csv predictions.csv --model wash [--chunk-size 10000] [--keep-columns id]
+    python score_file.py population.parquet predictions.parquet [--neighbors 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+from config import MODEL_CONFIGS, SCORE_CHUNK_SIZE
+from predictors import WashPredictor, OliverPredictor, LorinPredictor
+
+PREDICTOR_CLASSES = {'wash': WashPredictor, 'oliver': OliverPredictor, 'lorin': LorinPredictor}
+
+def detect_model(input_path):
+    """Model whose name prefixes the file name, as in wash_2021_ml_optimized.csv"""
+    name = Path(input_path).name.lower()
+    matches = [model_name for model_name in MODEL_CONFIGS if name.startswith(model_name)]
+    return matches[0] if len(matches) == 1 else None
+
+def input_columns(input_path):
+    """Column names of a CSV or Parquet file without reading its rows"""
+    if Path(input_path).suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(input_path).schema_arrow.names
+    return list(pd.read_csv(input_path, nrows=0).columns)
+
+def read_chunks(input_path, columns, chunk_size):
+    """Yield DataFrames of at most chunk_size rows holding only the requested columns"""
+    if Path(input_path).suffix == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, usecols=columns, chunksize=chunk_size)
+
+def predictions_frame(batch, index):
+    """Flatten columnar predictions into one column per target (plus _probability)"""
+    columns = {}
+    for target, target_columns in batch.items():
+        columns[target] = target_columns['prediction']
+        if target_columns.get('probability') is not None:
+            columns[f"{target}_probability"] = target_columns['probability']
+    return pd.DataFrame(columns, index=index)
+
+class ChunkWriter:
+    """Append scored chunks to a CSV or Parquet file
+
+    The first chunk fixes the columns. A later chunk missing some (a target
+    that failed only there) gets them empty, so nothing shifts under the CSV
+    header or breaks the Parquet schema; columns it adds are dropped.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = Path(output_path)
+        self.parquet = self.output_path.suffix == ".parquet"
+        self._writer = None
+        self._started = False
+        self._dtypes = None
+
+    def _conform(self, frame):
+        if self._dtypes is None:
+            self._dtypes = frame.dtypes
+            return frame
+        missing = [column for column in self._dtypes.index if column not in frame.columns]
+        extra = [column for column in frame.columns if column not in self._dtypes.index]
+        if missing or extra:
+            print(f"✗ Chunk columns differ from the first chunk (missing: {', '.join(missing) or '-'}, "
+                  f"dropped: {', '.join(extra) or '-'})")
+        frame = frame.reindex(columns=self._dtypes.index)
+        for column in missing:
+            # Nullable ints keep integer columns' type (and the Parquet schema) with empty cells
+            if pd.api.types.is_integer_dtype(self._dtypes[column]):
+                frame[column] = frame[column].astype("Int64")
+        return frame
+
+    def write(self, frame):
+        frame = self._conform(frame)
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._writer is None:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.output_path, table.schema)
+            else:
+                table = pa.Table.from_pandas(frame, schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.output_path, mode="a" if self._started else "w", header=not self._started, index=False)
+        self._started = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+def score_file(input_path, output_path, model_name=None, chunk_size=None, keep_columns=(), models_dir=None,
+               progress_every=1, neighbors=0):
+    """Score every row of a feature file and stream predictions to output_path
+
+    Features missing from the input are filled with 0, as in the predictors.
+    keep_columns (e.g. a respondent id) are copied through to the output.
+    With neighbors=k, each row also gets the distance to its nearest real
+    respondent and their outcomes averaged over the k nearest (neighbors.py).
+    Returns {'rows', 'elapsed', 'rows_per_second'}.
+    """
+    model_name = model_name or detect_model(input_path)
+    if model_name not in PREDICTOR_CLASSES:
+        raise ValueError(f"Cannot tell which model scores {input_path}; pass --model")
+    chunk_size = chunk_size or SCORE_CHUNK_SIZE
+
+    predictor = PREDICTOR_CLASSES[model_name](models_dir)
+    predictor.load_models()
+
+    index = None
+    if neighbors:
+        from neighbors import get_index
+        index = get_index(model_name)
+
+    available = set(input_columns(input_path))
+    missing_keep = [column for column in keep_columns if column not in available]
+    if missing_keep:
+        raise ValueError(f"Columns not in {input_path}: {', '.join(missing_keep)}")
+    missing = [feature for feature in predictor.features if feature not in available]
+    if missing:
+        print(f"✗ {len(missing)} features missing from input, scored as 0: {', '.join(missing)}")
+
+    # Only the columns that are used are parsed
+    wanted = set(predictor.features) | set(keep_columns)
+    columns = [column for column in input_columns(input_path) if column in wanted]
+
+    writer = ChunkWriter(output_path)
+    rows = 0
+    start = time.perf_counter()
+
+    try:
+        for chunk_number, chunk in enumerate(read_chunks(input_path, columns, chunk_size), start=1):
+            batch = predictor.predict_batch(chunk)
+            if not batch:
+                raise RuntimeError(f"No {model_name} target produced predictions")
+
+            scored = predictions_frame(batch, chunk.index)
+            if index is not None:
+                observed = index.observed_outcomes(chunk, neighbors)
+                observed.index = chunk.index
+                scored = pd.concat([scored, observed], axis=1)
+            if keep_columns:
+                scored = pd.concat([chunk[list(keep_columns)], scored], axis=1)
+            writer.write(scored)
+
+            rows += len(chunk)
+            if chunk_number % progress_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{rows:,} rows scored ({rows / max(elapsed, 1e-9):,.0f} rows/s)", flush=True)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    rate = rows / max(elapsed, 1e-9)
+    print(f"✓ Scored {rows:,} rows with {model_name} in {elapsed:.1f}s ({rate:,.0f} rows/s) -> {output_path}")
+    return {'rows': rows, 'elapsed': elapsed, 'rows_per_second': rate}
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a large feature file in chunks")
+    parser.add_argument("input", help="CSV or Parquet feature file")
+    parser.add_argument("output", help="CSV or Parquet predictions file (overwritten)")
+    parser.add_argument("--model", choices=sorted(PREDICTOR_CLASSES), help="Defaults to the file name prefix")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--keep-columns", nargs="*", default=[], help="Input columns copied to the output")
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--progress-every", type=int, default=1, help="Report progress every N chunks")
+    parser.add_argument("--neighbors", type=int, default=0, metavar="K",
+                        help="Add outcomes observed among the K nearest real respondents")
+    args = parser.parse_args()
+
+    try:
+        score_file(args.input, args.output, args.model, args.chunk_size, args.keep_columns,
+                   args.models_dir, args.progress_every, args.neighbors)
+    except (ValueError, RuntimeError) as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+What-if sensitivity sweeps: vary features of one extracted parameter set and
+score every grid point in one batch
+
+Each sweep builds a single matrix per model and sends it through
+ModelPredictor.predict_batch, so every target estimator is called once per
+sweep no matter how many features or grid points it covers.
+"""
+
+import itertools
+
+import numpy as np
+from config import MODEL_CONFIGS, FEATURE_RANGES, SENSITIVITY_POINTS
+
+def feature_grid(feature, points=None):
+    """Valid values of a feature: every integer in its range, or evenly spaced points"""
+    kind, minimum, maximum = FEATURE_RANGES[feature]
+    if kind == 'integer':
+        return np.arange(minimum, maximum + 1, dtype=float)
+    return np.linspace(minimum, maximum, points or SENSITIVITY_POINTS)
+
+def base_vector(parameters, model_name):
+    """One model's parameters as a vector in MODEL_CONFIGS feature order"""
+    model_params = parameters.get(model_name, {})
+    return np.array([model_params.get(feature, 0) for feature in MODEL_CONFIGS[model_name]['features']], dtype=float)
+
+def sweep_features(model_predictor, parameters, features=None, points=None, models=None):
+    """Vary each feature on its own across its range, holding the others at their extracted values
+
+    features defaults to every feature of each model. Returns
+    {model_name: {feature: {'values', 'baseline', 'targets'}}} where targets
+    maps each target to {'prediction': array, 'probability': array or None}
+    aligned with values.
+    """
+    matrices = {}
+    layouts = {}
+
+    for model_name in models or model_predictor.models:
+        if model_name not in model_predictor.models:
+            continue
+        feature_names = MODEL_CONFIGS[model_name]['features']
+        swept = [f for f in (features or feature_names) if f in feature_names]
+        if not swept:
+            continue
+
+        base = base_vector(parameters, model_name)
+        blocks = []
+        layouts[model_name] = []
+        for feature in swept:
+            values = feature_grid(feature, points)
+            block = np.tile(base, (len(values), 1))
+            block[:, feature_names.index(feature)] = values
+            blocks.append(block)
+            layouts[model_name].append((feature, values))
+
+        matrices[model_name] = np.vstack(blocks)
+
+    batch = model_predictor.predict_batch(matrices, use_cache=False)
+
+    curves = {}
+    for model_name, layout in layouts.items():
+        targets = batch.get(model_name)
+        if targets is None:
+            continue
+
+        curves[model_name] = {}
+        feature_names = MODEL_CONFIGS[model_name]['features']
+        base = base_vector(parameters, model_name)
+        start = 0
+        for feature, values in layout:
+            rows = slice(start, start + len(values))
+            curves[model_name][feature] = {
+                'values': values,
+                'baseline': base[feature_names.index(feature)],
+                'targets': _slice_targets(targets, rows)
+            }
+            start += len(values)
+
+    return curves
+
+def sweep_grid(model_predictor, parameters, grid, points=None, models=None):
+    """Vary several features jointly over the Cartesian product of their values
+
+    grid maps feature name to a sequence of values, or None for its full
+    range. Models are only swept over the grid features they use. Returns
+    {model_name: {'values': {feature: array}, 'targets': {...}}} with one
+    row per grid point.
+    """
+    grid = {feature: np.asarray(values if values is not None else feature_grid(feature, points), dtype=float)
+            for feature, values in grid.items()}
+    matrices = {}
+    axes = {}
+
+    for model_name in models or model_predictor.models:
+        if model_name not in model_predictor.models:
+            continue
+        feature_names = MODEL_CONFIGS[model_name]['features']
+        swept = [f for f in grid if f in feature_names]
+        if not swept:
+            continue
+
+        points_product = np.array(list(itertools.product(*(grid[f] for f in swept))), dtype=float)
+        matrix = np.tile(base_vector(parameters, model_name), (len(points_product), 1))
+        for column, feature in enumerate(swept):
+            matrix[:, feature_names.index(feature)] = points_product[:, column]
+
+        matrices[model_name] = matrix
+        axes[model_name] = {feature: points_product[:, column] for column, feature in enumerate(swept)}
+
+    batch = model_predictor.predict_batch(matrices, use_cache=False)
+
+    return {
+        model_name: {'values': values, 'targets': batch[model_name]}
+        for model_name, values in axes.items()
+        if batch.get(model_name) is not None
+    }
+
+def response_curve(columns):
+    """Plottable output of one target: positive-class probability if available, else the prediction"""
+    return columns['probability'] if columns.get('probability') is not None else columns['prediction']
+
+def rank_features(curves, target, model_name):
+    """Features ordered by how far they move one target across their range"""
+    spans = {
+        feature: float(np.ptp(response_curve(curve['targets'][target])))
+        for feature, curve in curves.get(model_name, {}).items()
+        if target in curve['targets']
+    }
+    return sorted(spans.items(), key=lambda item: item[1], reverse=True)
+
+def _slice_targets(targets, rows):
+    return {
+        target: {name: values[rows] if values is not None else None for name, values in columns.items()}
+        for target, columns in targets.items()
+    }
@@ -0,0 +1,244 @@
+"""
+Headless JSON prediction service, independent of the Streamlit app
+
+Loads every model once at boot, warms them with a throwaway prediction, and
+serves concurrent requests from a threaded HTTP server:
+
+    GET  /health          liveness; 200 as soon as the process is serving
+    GET  /ready           readiness; 503 until models are loaded and warm
+    GET  /metrics         stage timings and counters in Prometheus text format
+    POST /extract         {"persona": str, "intervention": str} -> {"parameters": {...}}
+    POST /predict         {"parameters": {model: {feature: value}}} -> {"predictions": {...}}
+    POST /predict_batch   {"personas": [parameters, ...]} or {"matrices": {model: [[...], ...]}}
+                          -> {"predictions": {model: {target: {"prediction": [...], ...}}}}
+
+Usage:
+    python service.py [--host 127.0.0.1] [--port 8000] [--models-dir DIR]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Larger request bodies are rejected before being read
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+class ServiceError(Exception):
+    """A request error reported to the client with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def to_json_compatible(value):
+    """Recursively convert NumPy arrays and scalars into JSON-serializable values"""
+    if isinstance(value, dict):
+        return {key: to_json_compatible(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_compatible(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+class PredictionService:
+    def __init__(self, models_dir=None, api_key=None):
+        self.models_dir = models_dir
+        self.api_key = api_key
+        self.model_predictor = None
+        self.llm_processor = None
+        self.ready = False
+        self.load_error = None
+        self.started_at = time.time()
+        self.ready_at = None
+
+    def start(self):
+        """Load models in the background so /health answers while they warm up"""
+        thread = threading.Thread(target=self._load, name="service-load", daemon=True)
+        thread.start()
+        return thread
+
+    def _load(self):
+        from config import MODEL_CONFIGS
+        from predictor import ModelPredictor
+
+        try:
+            self.model_predictor = ModelPredictor(self.models_dir)
+            if self.api_key:
+                from llm_processor import LLMProcessor
+                self.llm_processor = LLMProcessor(self.api_key)
+
+            # First call pays one-off costs (lazy imports, code paths) before real traffic does
+            self.model_predictor.predict_all({
+                model_name: {feature: 0 for feature in config['features']}
+                for model_name, config in MODEL_CONFIGS.items()
+            })
+
+            self.ready = bool(self.model_predictor.models)
+            self.ready_at = time.time()
+            print(f"✓ Service ready in {self.ready_at - self.started_at:.1f}s")
+        except Exception as e:
+            self.load_error = str(e)
+            print(f"✗ Service failed to load models: {e}")
+
+    def health(self):
+        return 200, {'status': 'ok', 'uptime': time.time() - self.started_at}
+
+    def readiness(self):
+        status = self.model_predictor.get_model_status() if self.model_predictor is not None else {}
+        body = {
+            'ready': self.ready,
+            'models': {name: model_status['loaded'] for name, model_status in status.items()},
+            'llm_available': self.llm_processor is not None,
+            'error': self.load_error
+        }
+        return (200 if self.ready else 503), body
+
+    def metrics(self):
+        from metrics import METRICS
+        return 200, METRICS.export_prometheus()
+
+    def extract(self, payload):
+        if self.llm_processor is None:
+            raise ServiceError(503, "LLM extraction is not configured (OPENAI_API_KEY is not set)")
+        persona = _require(payload, 'persona', str)
+        intervention = _require(payload, 'intervention', str)
+
+        parameters = self.llm_processor.extract_parameters(persona, intervention)
+        return 200, {
+            'parameters': parameters,
+            'extraction': self.llm_processor.last_extraction
+        }
+
+    def predict(self, payload):
+        self._require_ready()
+        parameters = _require(payload, 'parameters', dict)
+        return 200, {'predictions': self.model_predictor.predict_all(parameters)}
+
+    def predict_batch(self, payload):
+        self._require_ready()
+        if 'personas' in payload:
+            personas = _require(payload, 'personas', list)
+        elif 'matrices' in payload:
+            matrices = _require(payload, 'matrices', dict)
+            try:
+                personas = {model_name: np.asarray(rows, dtype=float) for model_name, rows in matrices.items()}
+            except (TypeError, ValueError) as e:
+                raise ServiceError(400, f"matrices must be numeric: {e}")
+        else:
+            raise ServiceError(400, "Expected 'personas' or 'matrices'")
+
+        return 200, {'predictions': self.model_predictor.predict_batch(personas)}
+
+    def _require_ready(self):
+        if not self.ready:
+            raise ServiceError(503, "Models are not loaded yet")
+
+def _require(payload, key, expected_type):
+    value = payload.get(key)
+    if not isinstance(value, expected_type):
+        raise ServiceError(400, f"'{key}' must be a {expected_type.__name__}")
+    return value
+
+def make_handler(service, quiet=False):
+    """Request handler class bound to one PredictionService"""
+    routes = {
+        ('GET', '/health'): lambda payload: service.health(),
+        ('GET', '/ready'): lambda payload: service.readiness(),
+        ('GET', '/metrics'): lambda payload: service.metrics(),
+        ('POST', '/extract'): service.extract,
+        ('POST', '/predict'): service.predict,
+        ('POST', '/predict_batch'): service.predict_batch
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def _dispatch(self, method):
+            path = self.path.split('?', 1)[0].rstrip('/') or '/'
+            route = routes.get((method, path))
+
+            try:
+                if route is None:
+                    allowed = [m for m, p in routes if p == path]
+                    raise ServiceError(405 if allowed else 404, f"No route for {method} {path}")
+                payload = self._read_json() if method == 'POST' else {}
+                status, body = route(payload)
+            except ServiceError as e:
+                status, body = e.status, {'error': str(e)}
+            except Exception as e:
+                status, body = 500, {'error': f"{type(e).__name__}: {e}"}
+
+            if isinstance(body, str):
+                self._send(status, body.encode('utf-8'), PROMETHEUS_CONTENT_TYPE)
+            else:
+                self._send(status, json.dumps(to_json_compatible(body)).encode('utf-8'), 'application/json')
+
+        def _read_json(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > MAX_BODY_BYTES:
+                raise ServiceError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+            try:
+                payload = json.loads(self.rfile.read(length) or b'{}')
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise ServiceError(400, f"Invalid JSON: {e}")
+            if not isinstance(payload, dict):
+                raise ServiceError(400, "Request body must be a JSON object")
+            return payload
+
+        def _send(self, status, data, content_type):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+    return Handler
+
+def serve(host=None, port=None, models_dir=None, quiet=False):
+    """Start the service and block until interrupted"""
+    from config import SERVICE_HOST, SERVICE_PORT
+
+    service = PredictionService(models_dir, api_key=os.getenv("OPENAI_API_KEY"))
+    server = ThreadingHTTPServer((host or SERVICE_HOST, port or SERVICE_PORT), make_handler(service, quiet))
+    server.daemon_threads = True
+    service.start()
+
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless prediction service")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--quiet", action="store_true", help="Do not log every request")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.models_dir, args.quiet)
+
+if __name__ == "__main__":
+    main()